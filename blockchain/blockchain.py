@@ -1,6 +1,13 @@
-import json
+import multiprocessing
+import os
+import struct
+import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from enum import IntEnum, StrEnum
+from functools import lru_cache, wraps
 from hashlib import sha256
 from pathlib import Path
 
@@ -8,6 +15,8 @@ from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.exceptions import InvalidSignature
 
+from blockchain import fastjson
+
 
 class TxTypes(IntEnum):
     COINBASE = 0  # Mining reward - creates new credits
@@ -36,6 +45,9 @@ class BlockKeys(StrEnum):
 
 BIT_OP = "0"
 
+# Bumped whenever the hash preimage layout changes; older snapshots no longer verify
+SNAPSHOT_VERSION = 7
+
 # Economic constants
 MINING_REWARD = 50.0  # Base credits earned per mined block
 ITEM_REQUEST_COST = 10.0  # Initial credits cost to request an item
@@ -53,6 +65,9 @@ MINER_ESCROW_PERCENTAGE = 0.3333  # 33.33% to miner (service fee)
 UID_MAX_LENGTH = 128
 UID_ALLOWED_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.')
 
+# Signature scheme for every user transaction; built once instead of per sign/verify call
+_ECDSA_SHA256 = ec.ECDSA(hashes.SHA256())
+
 # System-generated signatures: maps signature string → allowed TxTypes only
 # These bypass cryptographic verification; each is restricted to one tx type to
 # prevent an attacker from forging arbitrary transactions with a magic string.
@@ -64,6 +79,15 @@ _SYSTEM_SIGNATURES: dict[str, set] = {
 }
 
 
+def _locked(method):
+    """Run a Blockchain method while holding the chain's lock (it is re-entrant, so locked methods nest)."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 def validate_uid(uid: str) -> bool:
     """Return True if uid is a safe, non-empty string within allowed length."""
     if not uid or not isinstance(uid, str):
@@ -73,6 +97,45 @@ def validate_uid(uid: str) -> bool:
     return all(c in UID_ALLOWED_CHARS for c in uid)
 
 
+def _is_int(v) -> bool:
+    return type(v) is int
+
+
+def _is_number(v) -> bool:
+    return type(v) is float or type(v) is int
+
+
+def _is_opt_str(v) -> bool:
+    return v is None or isinstance(v, str)
+
+
+def _pack_bytes(b: bytes) -> bytes:
+    """Length-prefix a variable-size field so concatenated fields stay unambiguous."""
+    return struct.pack("<I", len(b)) + b
+
+
+def _pack_str(s: str | None) -> bytes:
+    """Length-prefixed UTF-8 of s (None packs as ""); any other type raises ValueError."""
+    if s is None:
+        s = ""
+    elif not isinstance(s, str):
+        raise ValueError(f"expected a string field, got {type(s).__name__}")
+    return _pack_bytes(s.encode())
+
+
+def _pack_hash(h: str | None) -> bytes:
+    """
+    Pack a block hash as its 32 raw digest bytes; anything that isn't a well-formed
+    hex digest (e.g. a hand-edited prev_hash) falls back to a tagged string field.
+    """
+    if h is not None and len(h) == 64:
+        try:
+            return b"\x01" + bytes.fromhex(h)
+        except ValueError:
+            pass
+    return b"\x00" + _pack_str(h)
+
+
 def serialize_pubkey(pubkey: ec.EllipticCurvePublicKey) -> str:
     # sec1 compressed format
     return pubkey.public_bytes(
@@ -81,7 +144,9 @@ def serialize_pubkey(pubkey: ec.EllipticCurvePublicKey) -> str:
     ).hex()
 
 
+@lru_cache(maxsize=8192)
 def deserialize_pubkey(hex_s: str) -> ec.EllipticCurvePublicKey:
+    # keys repeat heavily across a chain; memoize the point decompression/validation
     return ec.EllipticCurvePublicKey.from_encoded_point(
         ec.SECP256R1(),
         bytes.fromhex(hex_s)
@@ -123,17 +188,181 @@ def calculate_new_item_value(current_value: float, demand_count: int) -> float:
     return current_value * (1 + percentage)
 
 
+def merkle_root(leaves: list[bytes]) -> bytes:
+    """
+    Binary SHA-256 Merkle root; an odd node at any level is paired with itself.
+    The tx count is part of the block header, so duplicated tails can't be passed off
+    as a different transaction list with the same root.
+    """
+    if not leaves:
+        return b"\x00" * 32
+
+    level = leaves
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+
+    return level[0]
+
+
+def pow_target(difficulty: int) -> int:
+    """
+    Integer proof-of-work target for `difficulty` leading zero hex digits:
+    a block passes when int.from_bytes(digest, 'big') < target.
+    """
+    return 1 << (256 - 4 * difficulty)
+
+
+def find_nonce(prefix: bytes, nonce: int, target: int) -> tuple[int, bytes]:
+    """
+    Sweep nonces upward from `nonce` until sha256(prefix + str(nonce)) is below `target`.
+    Returns the winning nonce and its raw digest.
+    Everything the loop touches is bound to a local so each attempt stays in fast opcodes.
+    """
+    # midstate: only the nonce changes between attempts, so the prefix is hashed once
+    # and each attempt clones the 32-byte state and feeds just the nonce digits
+    clone = sha256(prefix).copy
+
+    if target >> 256:  # difficulty 0: any digest passes
+        h = clone()
+        h.update(str(nonce).encode())
+        return nonce, h.digest()
+
+    # big-endian bytes of equal length order exactly like the integers they encode,
+    # so one bytes comparison stands in for int.from_bytes(digest) < target
+    limit = target.to_bytes(32, 'big')
+
+    while True:
+        h = clone()
+        h.update(str(nonce).encode())
+        digest = h.digest()
+        if digest < limit:
+            return nonce, digest
+
+        nonce += 1
+
+
+# Batches at least this large are fanned out over the verify pool
+_VERIFY_BATCH_MIN = 64
+_VERIFY_CHUNK = 32  # transactions per worker round-trip
+_verify_pool: ProcessPoolExecutor | None = None
+_verify_pool_lock = threading.Lock()  # add_block and the UI monitors verify concurrently
+
+
+def _verify_mp_context():
+    """
+    Start method for the verify pool. Never fork: the callers are threaded (P2P loop, UI
+    monitors, web request threads) and a forked child can inherit a held lock. forkserver
+    children are forked from a clean server process; spawn is the fallback where it is missing.
+    Both re-import the entry-point module in each worker, so entry points must not load a
+    chain or start threads at import time, and must call multiprocessing.freeze_support() first
+    so a frozen (PyInstaller) build runs the worker instead of a second copy of the app.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+@lru_cache(maxsize=65536)
+def _ecdsa_verdict(requester: str, message: bytes, signature) -> bool:
+    """
+    ECDSA check of signature over message by requester. Memoized on content, so a tx decoded
+    again from a block or peer chain reuses the verdict its mempool copy already earned.
+    Picklable, so it also runs inside the verify pool (each worker keeps its own caches).
+    """
+    try:
+        deserialize_pubkey(requester).verify(bytes.fromhex(signature), message, _ECDSA_SHA256)
+        return True
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+
+
+def verify_transactions(txs: list['Transaction']) -> bool:
+    """
+    Verify every signature in txs; requester keys come from the deserialize_pubkey cache and
+    transactions that already carry a memoized verdict are not re-checked.
+    Large batches are spread over a process pool when more than one core is available, so
+    the scalar math runs outside the GIL. Only (requester, signable bytes, signature) cross
+    the process boundary and the verdicts are memoized back onto the transactions.
+    """
+    global _verify_pool
+
+    pending: list['Transaction'] = []
+    for tx in txs:
+        verdict = tx.system_verdict()
+        if verdict is None:
+            verdict = tx._verified
+            if verdict is None:
+                pending.append(tx)
+                continue
+        if not verdict:
+            return False
+
+    workers = os.cpu_count() or 1
+    # a pool worker (or anything else running in a child process) checks in-process, never nesting pools
+    if workers > 1 and len(pending) >= _VERIFY_BATCH_MIN and multiprocessing.parent_process() is None:
+        with _verify_pool_lock:
+            if _verify_pool is None:
+                _verify_pool = ProcessPoolExecutor(max_workers=workers, mp_context=_verify_mp_context())
+            pool = _verify_pool
+        try:
+            verdicts = list(pool.map(
+                _ecdsa_verdict,
+                [tx.requester for tx in pending],
+                [tx.signable_bytes() for tx in pending],
+                [tx.signature for tx in pending],
+                chunksize=_VERIFY_CHUNK
+            ))
+        except BrokenProcessPool:
+            # a worker died; reap the pool, recreate it next time and check this batch in-process
+            with _verify_pool_lock:
+                if _verify_pool is pool:
+                    _verify_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        except (ValueError, TypeError):
+            return False  # a malformed transaction: unpackable fields or an unhashable signature
+        else:
+            for tx, verdict in zip(pending, verdicts):
+                tx._verified = verdict
+            return all(verdicts)
+
+    return all(tx.ecdsa_ok() for tx in pending)
+
+
 class Transaction:
+    __slots__ = ('requester', 'uid', 'tx_type', 'timestamp', 'signature', 'amount', 'recipient', 'accepted_offer',
+                 '_verified', '_signable', '_canon', '_digest', '_full')
+
+    # Memo slots each field feeds; reassigning the field drops them. Signed fields feed every
+    # preimage and the ECDSA verdict, the other hashed fields the block-hash bytes, the
+    # signature only the verdict; to_full_dict() renders them all
+    _MEMOS = {
+        **dict.fromkeys(('tx_type', 'timestamp', 'requester', 'uid'),
+                        ('_signable', '_canon', '_digest', '_verified', '_full')),
+        **dict.fromkeys(('amount', 'recipient', 'accepted_offer'), ('_canon', '_digest', '_full')),
+        'signature': ('_verified', '_full'),
+    }
+
     def __init__(self, pub_key: ec.EllipticCurvePublicKey, uid, tx_type=TxTypes.REQUEST, ts=None, sig=None, amount=0.0,
                  recipient=None, accepted_offer=None):
-        self.requester = serialize_pubkey(pub_key)
-        self.uid = uid
-        self.tx_type = tx_type
-        self.timestamp = ts or time.time()
-        self.signature = sig
-        self.amount = amount  # Credits amount (for COINBASE, TRANSFER, BUYOUT_OFFER, or calculated refund)
-        self.recipient = recipient  # For TRANSFER transactions (serialized pubkey)
-        self.accepted_offer = accepted_offer  # For RELEASE transactions accepting a buyout (offer tx hash)
+        # a new tx has no memos to invalidate, so slots are written past __setattr__
+        put = object.__setattr__
+        put(self, '_signable', None)  # memoized preimages: signable_bytes(), canonical_bytes(), digest()
+        put(self, '_canon', None)
+        put(self, '_digest', None)
+        put(self, '_full', None)
+        put(self, '_verified', None)  # memoized ECDSA outcome
+        # interned: every tx from the same key/for the same item shares one string object, so the
+        # ledger, allocation and mempool dicts resolve equal keys by identity instead of memcmp
+        put(self, 'requester', sys.intern(serialize_pubkey(pub_key)))
+        put(self, 'uid', sys.intern(uid) if type(uid) is str else uid)
+        put(self, 'tx_type', tx_type)
+        put(self, 'timestamp', ts if ts is not None else time.time())
+        put(self, 'signature', sig)
+        put(self, 'amount', amount)  # Credits amount (for COINBASE, TRANSFER, BUYOUT_OFFER, or calculated refund)
+        # For TRANSFER transactions (serialized pubkey)
+        put(self, 'recipient', sys.intern(recipient) if type(recipient) is str else recipient)
+        put(self, 'accepted_offer', accepted_offer)  # For RELEASE transactions accepting a buyout (offer tx hash)
 
     def to_signable_dict(self):
         """Return dict with only immutable fields for signing (excludes amount set after signing)"""
@@ -151,36 +380,99 @@ class Transaction:
             TxKeys.TYPE: self.tx_type,
             TxKeys.TIMESTAMP: self.timestamp
         }
-        # Handle backward compatibility
-        amount = getattr(self, 'amount', 0.0)
-        recipient = getattr(self, 'recipient', None)
-        accepted_offer = getattr(self, 'accepted_offer', None)
-
-        if amount != 0.0:
-            d['amount'] = amount
-        if recipient:
-            d['recipient'] = recipient
-        if accepted_offer:
-            d['accepted_offer'] = accepted_offer
+        if self.amount != 0.0:
+            d['amount'] = self.amount
+        if self.recipient:
+            d['recipient'] = self.recipient
+        if self.accepted_offer:
+            d['accepted_offer'] = self.accepted_offer
         return d
 
+    def __setattr__(self, name, value):
+        put = object.__setattr__
+        for memo in Transaction._MEMOS.get(name, ()):
+            put(self, memo, None)
+        put(self, name, value)
+
+    def signable_bytes(self) -> bytes:
+        """
+        Fixed binary layout of to_signable_dict(); this is what gets signed. Memoized.
+        Raises ValueError when a field can't be packed (e.g. tx_type > 255 or a non-str uid).
+        """
+        if self._signable is None:
+            try:
+                self._signable = (struct.pack("<Bd", int(self.tx_type), self.timestamp)
+                                  + _pack_str(self.requester)
+                                  + _pack_str(self.uid))
+            except (struct.error, TypeError, OverflowError) as e:
+                raise ValueError(f"malformed transaction: {e}") from e
+        return self._signable
+
+    def canonical_bytes(self) -> bytes:
+        """
+        Fixed binary layout of to_dict() used for block hashing (covers amount set after signing). Memoized.
+        Raises ValueError like signable_bytes().
+        """
+        if self._canon is None:
+            try:
+                self._canon = (self.signable_bytes()
+                               + struct.pack("<d", self.amount)
+                               + _pack_str(self.recipient)
+                               + _pack_str(self.accepted_offer))
+            except (struct.error, TypeError) as e:
+                raise ValueError(f"malformed transaction: {e}") from e
+        return self._canon
+
+    def digest(self) -> bytes:
+        """SHA-256 of canonical_bytes(); the leaf that Block.txs_root() combines. Memoized."""
+        if self._digest is None:
+            self._digest = sha256(self.canonical_bytes()).digest()
+        return self._digest
+
     def to_full_dict(self):
         """
         Extended representation including signature for UI/inspection.
         This is not used by compute_hash() to preserve original behavior.
+        Memoized until a field is reassigned; callers must treat the dict as read-only.
         """
-        d = self.to_dict()
-        d[TxKeys.SIG] = self.signature
-        return d
+        if self._full is None:
+            d = self.to_dict()
+            d[TxKeys.SIG] = self.signature
+            self._full = d
+        return self._full
 
     def sign(self, priv_key: ec.EllipticCurvePrivateKey):
         # Sign only immutable fields (amount is set later in add_to_mempool)
-        d = json.dumps(self.to_signable_dict(), sort_keys=True).encode()
+        d = self.signable_bytes()
 
-        sig = priv_key.sign(d, ec.ECDSA(hashes.SHA256()))
+        sig = priv_key.sign(d, _ECDSA_SHA256)
         self.signature = sig.hex()
 
-    def verify(self):
+    @staticmethod
+    def sign_batch(priv_key: ec.EllipticCurvePrivateKey, txs: list['Transaction']):
+        """sign() every tx with one key; the bound sign method and scheme object are looked up once."""
+        sign = priv_key.sign
+        scheme = _ECDSA_SHA256
+        for tx in txs:
+            tx.signature = sign(tx.signable_bytes(), scheme).hex()
+
+    @classmethod
+    def make_many(cls, pub_key: ec.EllipticCurvePublicKey, uids, tx_type,
+                  priv_key: ec.EllipticCurvePrivateKey) -> list['Transaction']:
+        """
+        Build and sign one tx_type transaction per uid for a single key (e.g. a multi-item request).
+        Every tx shares one timestamp and the batch is signed by sign_batch().
+        """
+        now = time.time()
+        txs = [cls(pub_key, uid, tx_type, ts=now) for uid in uids]
+        cls.sign_batch(priv_key, txs)
+        return txs
+
+    def system_verdict(self) -> bool | None:
+        """
+        Verdict for transactions that carry no user signature.
+        Returns None when a real ECDSA check is required.
+        """
         # COINBASE transactions don't carry a user signature
         if self.tx_type == TxTypes.COINBASE:
             return True
@@ -189,31 +481,55 @@ class Transaction:
         # the tx_type matches the exact type that the system is allowed to produce
         # with that signature.  This prevents an attacker from forging, e.g., a
         # TRANSFER with signature="BUYOUT_PAYMENT" to skip real verification.
-        allowed_types = _SYSTEM_SIGNATURES.get(self.signature)
+        allowed_types = _SYSTEM_SIGNATURES.get(self.signature) if isinstance(self.signature, str) else None
         if allowed_types is not None:
             return self.tx_type in allowed_types
 
+        return None
+
+    def ecdsa_ok(self) -> bool:
+        """
+        ECDSA check against the requester's own key. The outcome is memoized until the
+        signature or a signed field is reassigned, so re-audits skip the scalar math.
+        """
+        if self._verified is None:
+            try:
+                self._verified = _ecdsa_verdict(self.requester, self.signable_bytes(), self.signature)
+            except (ValueError, TypeError):
+                self._verified = False  # unpackable fields, or ones the verdict cache can't hash
+        return self._verified
+
+    def verify(self):
+        verdict = self.system_verdict()
+        if verdict is not None:
+            return verdict
+
         # All other transactions require a real ECDSA signature over the immutable fields.
-        try:
-            pubk = deserialize_pubkey(self.requester)
-            d = json.dumps(self.to_signable_dict(), sort_keys=True).encode()
-            pubk.verify(bytes.fromhex(self.signature), d, ec.ECDSA(hashes.SHA256()))
-            return True
-        except (InvalidSignature, ValueError):
-            return False
+        return self.ecdsa_ok()
 
     def __str__(self):
-        return json.dumps(self.to_dict(), sort_keys=True)
+        return fastjson.dumps(self.to_dict(), sort_keys=True)
 
 
 class Block:
+    __slots__ = ('hash', 'index', 'prev_hash', 'transactions', 'nonce', 'timestamp', '_full')
+
     def __init__(self, idx: int, prev_hash, txs, nonce=0, ts=None):
-        self.hash = None
-        self.index = idx
-        self.prev_hash = prev_hash
-        self.transactions: list[Transaction] = txs
-        self.nonce = nonce
-        self.timestamp = ts or time.time()
+        # nothing is rendered yet, so slots are written past __setattr__
+        put = object.__setattr__
+        put(self, '_full', None)
+        put(self, 'hash', None)
+        put(self, 'index', idx)
+        put(self, 'prev_hash', prev_hash)
+        put(self, 'transactions', txs)
+        put(self, 'nonce', nonce)
+        put(self, 'timestamp', ts if ts is not None else time.time())
+
+    def __setattr__(self, name, value):
+        # any field reassignment (hash after mining, in-place corruption from the UIs) drops the rendering
+        if name != '_full':
+            object.__setattr__(self, '_full', None)
+        object.__setattr__(self, name, value)
 
     def to_dict(self) -> dict:
         return {
@@ -227,8 +543,17 @@ class Block:
     def to_full_dict(self) -> dict:
         """
         Extended representation including signatures in transactions for UI display.
+        Memoized, so chain dumps and repeated broadcasts of the same block reuse one dict;
+        callers must treat it as read-only.
         """
-        return {
+        full = self._full
+        if full is not None:
+            # still valid only while every transaction hands back the very dict embedded here
+            txs = full[BlockKeys.TXS]
+            if len(txs) == len(self.transactions) and all(
+                    tx.to_full_dict() is d for tx, d in zip(self.transactions, txs)):
+                return full
+        full = {
             BlockKeys.INDEX: self.index,
             BlockKeys.PREV_HASH: self.prev_hash,
             BlockKeys.TXS: [tx.to_full_dict() for tx in self.transactions],
@@ -236,95 +561,216 @@ class Block:
             BlockKeys.TIMESTAMP: self.timestamp,
             BlockKeys.HASH: self.hash
         }
+        self._full = full
+        return full
+
+    def txs_root(self) -> bytes:
+        """
+        Merkle root over the per-tx digests, the block's 32-byte commitment to every transaction.
+        Leaves are memoized on each transaction (and dropped if it is edited), so this costs
+        about one 64-byte hash per transaction regardless of how large the transactions are.
+        """
+        return merkle_root([tx.digest() for tx in self.transactions])
+
+    def hash_prefix(self) -> bytes:
+        """
+        Canonical binary hash preimage of every field except the nonce: a fixed-size header
+        of index, timestamp, tx count, prev_hash and txs_root().
+        The nonce is appended last so proof_of_work can absorb this prefix once.
+        Raises ValueError when a field can't be packed (e.g. a non-numeric timestamp), like
+        Transaction.canonical_bytes().
+        """
+        try:
+            header = struct.pack("<qdI", self.index, self.timestamp, len(self.transactions))
+        except (struct.error, TypeError, OverflowError) as e:
+            raise ValueError(f"malformed block: {e}") from e
+        return header + _pack_hash(self.prev_hash) + self.txs_root()
+
+    def compute_digest(self) -> bytes:
+        return sha256(self.hash_prefix() + str(self.nonce).encode()).digest()
 
     def compute_hash(self) -> str:
-        blk = self.to_dict()
-        return sha256(json.dumps(blk, sort_keys=True).encode()).hexdigest()
+        return self.compute_digest().hex()
 
     def hash_ok(self) -> bool:
-        return self.hash == self.compute_hash()
+        try:
+            return self.hash == self.compute_hash()
+        except ValueError:
+            return False  # a field can't be packed, so no stored hash can match
 
     def pow_ok(self, difficulty: int) -> bool:
         """Check that the stored hash satisfies the proof-of-work target."""
-        return bool(self.hash) and self.hash.startswith(BIT_OP * difficulty)
+        try:
+            return int(self.hash, 16) < pow_target(difficulty)
+        except (TypeError, ValueError):
+            return False
 
     def signatures_ok(self):
-        for tx in self.transactions:
-            if not tx.verify():
-                return False
-
-        return True
+        return verify_transactions(self.transactions)
 
     def __str__(self):
-        return json.dumps(self.to_dict(), sort_keys=True)
+        return fastjson.dumps(self.to_dict(), sort_keys=True)
+
+
+class Mempool:
+    """
+    Pending transactions in arrival order, indexed so admission checks touch only related entries.
+    Iterates, sizes and clears like the plain list it replaces.
+    """
+
+    def __init__(self):
+        self._txs: dict[int, Transaction] = {}  # id(tx) -> tx, insertion ordered
+        self._by_key: dict[tuple[str, int], Transaction] = {}  # (uid, tx_type) -> tx, BUYOUT_OFFER excluded
+        self._by_uid: dict[str, list[Transaction]] = {}
+        self._by_requester: dict[str, list[Transaction]] = {}
+        self._by_recipient: dict[str, list[Transaction]] = {}  # incoming TRANSFERs
+
+    def __iter__(self):
+        return iter(list(self._txs.values()))
+
+    def __len__(self):
+        return len(self._txs)
+
+    def __contains__(self, tx: Transaction):
+        return id(tx) in self._txs
+
+    @staticmethod
+    def _index_add(index: dict[str, list[Transaction]], key: str, tx: Transaction):
+        index.setdefault(key, []).append(tx)
+
+    @staticmethod
+    def _index_remove(index: dict[str, list[Transaction]], key: str, tx: Transaction):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.remove(tx)
+            if not bucket:
+                del index[key]
+
+    def append(self, tx: Transaction):
+        self._txs[id(tx)] = tx
+        if tx.tx_type != TxTypes.BUYOUT_OFFER:
+            self._by_key[(tx.uid, tx.tx_type)] = tx
+        self._index_add(self._by_uid, tx.uid, tx)
+        self._index_add(self._by_requester, tx.requester, tx)
+        if tx.tx_type == TxTypes.TRANSFER and tx.recipient:
+            self._index_add(self._by_recipient, tx.recipient, tx)
+
+    def remove(self, tx: Transaction):
+        del self._txs[id(tx)]
+        if self._by_key.get((tx.uid, tx.tx_type)) is tx:
+            del self._by_key[(tx.uid, tx.tx_type)]
+        self._index_remove(self._by_uid, tx.uid, tx)
+        self._index_remove(self._by_requester, tx.requester, tx)
+        if tx.tx_type == TxTypes.TRANSFER and tx.recipient:
+            self._index_remove(self._by_recipient, tx.recipient, tx)
+
+    def discard(self, tx: Transaction):
+        """Remove tx if it is pending; a no-op otherwise."""
+        if id(tx) in self._txs:
+            self.remove(tx)
+
+    def clear(self):
+        self._txs.clear()
+        self._by_key.clear()
+        self._by_uid.clear()
+        self._by_requester.clear()
+        self._by_recipient.clear()
+
+    def get(self, uid: str, tx_type: int) -> Transaction | None:
+        """The pending non-BUYOUT_OFFER tx for (uid, tx_type), if any."""
+        return self._by_key.get((uid, tx_type))
+
+    def for_uid(self, uid: str) -> list[Transaction]:
+        return list(self._by_uid.get(uid, ()))
+
+    def buyout_offer(self, uid: str, offer_id: str) -> Transaction | None:
+        """The earliest pending BUYOUT_OFFER for uid whose id (str of its timestamp) is offer_id."""
+        for tx in self._by_uid.get(uid, ()):
+            if tx.tx_type == TxTypes.BUYOUT_OFFER and str(tx.timestamp) == offer_id:
+                return tx
+        return None
+
+    def from_requester(self, pub_key_hex: str) -> list[Transaction]:
+        return list(self._by_requester.get(pub_key_hex, ()))
+
+    def to_recipient(self, pub_key_hex: str) -> list[Transaction]:
+        return list(self._by_recipient.get(pub_key_hex, ()))
 
 
 class Blockchain:
     def __init__(self, difficulty: int = 2):
         self.chain: list[Block] = []
         self.difficulty: int = difficulty
-        self.mempool: list[Transaction] = []  # Pending transactions
+        self.mempool: Mempool = Mempool()  # Pending transactions
         self.item_request_times: dict[str, float] = {}  # Track when items were requested
         self.item_demand_counters: dict[str, int] = {}  # Track failed request attempts per item
         self.item_values: dict[str, float] = {}  # Current value of each reserved item
         self.item_escrow: dict[str, float] = {}  # Accumulated penalty fees per item (in escrow)
         self.active_buyout_offers: dict[str, list[Transaction]] = {}  # Buyout offers per item (legacy, may remove)
+        # Incremental chain state (allocation, balances), folded forward from self.chain[:_tracked_height]
+        self._balances: dict[str, float] = {}  # pubkey hex -> confirmed balance
+        self._allocated: dict[str, str] = {}  # item uid -> current holder pubkey
+        self._seen: set[str] = set()  # every uid that appears on chain
+        self._available: set[str] = set()  # _seen minus _allocated, maintained alongside both
+        self._tracked_chain: list[Block] | None = None
+        self._tracked_height: int = 0
+        # content keys (see _verification_key) of blocks whose signatures already passed an audit
+        self._verified_blocks: set[bytes] = set()
+        # set whenever the chain changes (add_block, mine_block, replace_chain, repair); monitors wait
+        # on it instead of sleeping, so a new block is audited at once. Consumers clear it themselves.
+        self.mutated = threading.Event()
+        # Guards the chain list and everything derived from it. Mutators hold it for their whole update and
+        # the lazy readers hold it while folding and copying, so a reader never sees (or re-folds) a
+        # half-applied block. Front ends that read several values at once may hold it around all of them.
+        self.lock = threading.RLock()
         self.genesis()
-        self._migrate_old_transactions()
-
-    def _migrate_old_transactions(self):
-        """Add missing attributes to old transactions for backward compatibility"""
-        for block in self.chain:
-            for tx in block.transactions:
-                if not hasattr(tx, 'amount'):
-                    tx.amount = 0.0
-                if not hasattr(tx, 'recipient'):
-                    tx.recipient = None
-                if not hasattr(tx, 'accepted_offer'):
-                    tx.accepted_offer = None
-
-        # Rebuild item tracking from chain
+        # Transaction.__slots__ are all assigned in __init__, so loaded chains never lack
+        # amount/recipient/accepted_offer; only the item tracking needs rebuilding
         self._rebuild_item_tracking()
 
     def _rebuild_item_tracking(self):
-        """Rebuild item tracking from blockchain history"""
+        """Rebuild item tracking from blockchain history (init fallback, replace_chain, repair)"""
         self.item_request_times.clear()
         self.item_demand_counters.clear()
         self.item_values.clear()
         self.item_escrow.clear()
 
         for block in self.chain:
-            for tx in block.transactions:
-                if tx.tx_type == TxTypes.REQUEST:
-                    # Check if this is a regular request, buyout, or penalty
-                    if tx.amount == ITEM_REQUEST_COST:
-                        # Regular request - item was available
-                        self.item_request_times[tx.uid] = tx.timestamp
-                        self.item_values[tx.uid] = ITEM_REQUEST_COST  # Start at base value
-                        self.item_demand_counters[tx.uid] = 0
-                    elif tx.amount > ITEM_REQUEST_COST:
-                        # Buyout - paid current value
-                        self.item_request_times[tx.uid] = tx.timestamp
-                        self.item_values[tx.uid] = ITEM_REQUEST_COST  # Reset to base
-                        self.item_demand_counters[tx.uid] = 0
-                        # Escrow would have been distributed, so clear it
-                        self.item_escrow.pop(tx.uid, None)
-                    else:
-                        # Penalty - failed attempt
-                        # Increase value and add to escrow
-                        if tx.uid in self.item_values:
-                            demand = self.item_demand_counters.get(tx.uid, 0)
-                            self.item_escrow[tx.uid] = self.item_escrow.get(tx.uid, 0.0) + tx.amount
-                            self.item_values[tx.uid] = calculate_new_item_value(self.item_values[tx.uid], demand)
-                            self.item_demand_counters[tx.uid] = demand + 1
+            self._apply_block_tracking(block)
 
-                elif tx.tx_type == TxTypes.RELEASE:
-                    # Remove from tracking when released
-                    self.item_request_times.pop(tx.uid, None)
-                    self.item_values.pop(tx.uid, None)
-                    self.item_demand_counters.pop(tx.uid, None)
-                    # Escrow distributed on release
+    def _apply_block_tracking(self, block: Block):
+        """Fold one appended block into the item tracking; replaying every block rebuilds it"""
+        for tx in block.transactions:
+            if tx.tx_type == TxTypes.REQUEST:
+                # Check if this is a regular request, buyout, or penalty
+                if tx.amount == ITEM_REQUEST_COST:
+                    # Regular request - item was available
+                    self.item_request_times[tx.uid] = tx.timestamp
+                    self.item_values[tx.uid] = ITEM_REQUEST_COST  # Start at base value
+                    self.item_demand_counters[tx.uid] = 0
+                elif tx.amount > ITEM_REQUEST_COST:
+                    # Buyout - paid current value
+                    self.item_request_times[tx.uid] = tx.timestamp
+                    self.item_values[tx.uid] = ITEM_REQUEST_COST  # Reset to base
+                    self.item_demand_counters[tx.uid] = 0
+                    # Escrow would have been distributed, so clear it
                     self.item_escrow.pop(tx.uid, None)
+                else:
+                    # Penalty - failed attempt
+                    # Increase value and add to escrow
+                    if tx.uid in self.item_values:
+                        demand = self.item_demand_counters.get(tx.uid, 0)
+                        self.item_escrow[tx.uid] = self.item_escrow.get(tx.uid, 0.0) + tx.amount
+                        self.item_values[tx.uid] = calculate_new_item_value(self.item_values[tx.uid], demand)
+                        self.item_demand_counters[tx.uid] = demand + 1
+
+            elif tx.tx_type == TxTypes.RELEASE:
+                # Remove from tracking when released
+                self.item_request_times.pop(tx.uid, None)
+                self.item_values.pop(tx.uid, None)
+                self.item_demand_counters.pop(tx.uid, None)
+                # Escrow distributed on release
+                self.item_escrow.pop(tx.uid, None)
 
     def genesis(self):
         # only create this block if chain is empty
@@ -345,38 +791,25 @@ class Blockchain:
             b.hash = b.compute_hash()
             self.chain.append(b)
 
+    @property
+    def target(self) -> int:
+        # derived on access: replace_chain and the UIs assign difficulty directly
+        return pow_target(self.difficulty)
+
     @property
     def last_hash(self):
         return self.chain[-1].hash
 
+    @_locked
     def get_balance(self, pub_key_hex: str) -> float:
         """
-        Calculate balance for a given public key by walking the chain.
+        Confirmed balance for a given public key, read from the incremental ledger.
 
         :param pub_key_hex: Serialized public key (hex string)
         :return: Current balance in credits
         """
-        balance = 0.0
-
-        for block in self.chain:
-            for tx in block.transactions:
-                # Earned credits (COINBASE or RELEASE)
-                if tx.requester == pub_key_hex:
-                    if tx.tx_type == TxTypes.COINBASE:
-                        balance += tx.amount
-                    elif tx.tx_type == TxTypes.RELEASE:
-                        balance += tx.amount
-                    elif tx.tx_type == TxTypes.REQUEST:
-                        # REQUEST can be: regular (10), penalty (<10), or buyout (>10)
-                        balance -= tx.amount
-                    elif tx.tx_type == TxTypes.TRANSFER:
-                        balance -= tx.amount
-
-                # Received transfer
-                if tx.tx_type == TxTypes.TRANSFER and tx.recipient == pub_key_hex:
-                    balance += tx.amount
-
-        return balance
+        self._sync_state()
+        return self._balances.get(pub_key_hex, 0.0)
 
     def get_pending_balance(self, pub_key_hex: str) -> float:
         """
@@ -389,56 +822,89 @@ class Blockchain:
         balance = self.get_balance(pub_key_hex)
 
         # Apply pending mempool transactions
-        for tx in self.mempool:
-            if tx.requester == pub_key_hex:
-                if tx.tx_type == TxTypes.REQUEST:
-                    balance -= tx.amount  # Variable: regular/penalty/buyout
-                elif tx.tx_type == TxTypes.RELEASE:
-                    balance += tx.amount
-                elif tx.tx_type == TxTypes.TRANSFER:
-                    balance -= tx.amount
-                elif tx.tx_type == TxTypes.BUYOUT_OFFER:
-                    balance -= tx.amount
-
-            if tx.tx_type == TxTypes.TRANSFER and tx.recipient == pub_key_hex:
+        for tx in self.mempool.from_requester(pub_key_hex):
+            if tx.tx_type == TxTypes.REQUEST:
+                balance -= tx.amount  # Variable: regular/penalty/buyout
+            elif tx.tx_type == TxTypes.RELEASE:
                 balance += tx.amount
+            elif tx.tx_type == TxTypes.TRANSFER:
+                balance -= tx.amount
+            elif tx.tx_type == TxTypes.BUYOUT_OFFER:
+                balance -= tx.amount
 
-        return balance
+        for tx in self.mempool.to_recipient(pub_key_hex):
+            balance += tx.amount
 
-    def allocation(self):
-        allocated = {}
+        return balance
 
-        for blk in self.chain:
+    def _apply_balance(self, tx: Transaction):
+        """Fold one confirmed transaction into the balance ledger (same rules get_balance always used)."""
+        bal = self._balances
+        # Earned credits (COINBASE or RELEASE)
+        if tx.tx_type == TxTypes.COINBASE or tx.tx_type == TxTypes.RELEASE:
+            bal[tx.requester] = bal.get(tx.requester, 0.0) + tx.amount
+        elif tx.tx_type == TxTypes.REQUEST or tx.tx_type == TxTypes.TRANSFER:
+            # REQUEST can be: regular (10), penalty (<10), or buyout (>10)
+            bal[tx.requester] = bal.get(tx.requester, 0.0) - tx.amount
+
+        # Received transfer
+        if tx.tx_type == TxTypes.TRANSFER:
+            bal[tx.recipient] = bal.get(tx.recipient, 0.0) + tx.amount
+
+    @_locked
+    def _sync_state(self):
+        """
+        Bring the incremental allocation and balance state up to the current tip.
+        Appended blocks are folded in one at a time; if the chain list was replaced
+        or truncated (repair, replace_chain, init) the state is rebuilt once.
+        """
+        if self._tracked_chain is not self.chain or self._tracked_height > len(self.chain):
+            self._allocated.clear()
+            self._seen.clear()
+            self._available.clear()
+            self._balances.clear()
+            self._tracked_chain = self.chain
+            self._tracked_height = 0
+
+        for blk in self.chain[self._tracked_height:]:
             for tx in blk.transactions:
+                self._apply_balance(tx)
+                if tx.uid not in self._seen:
+                    self._seen.add(tx.uid)
+                    self._available.add(tx.uid)
                 if tx.tx_type == TxTypes.REQUEST:
                     # Only regular requests (10) and buyouts (>10) add to allocation
                     # Penalties (<10) don't change allocation
                     if tx.amount >= ITEM_REQUEST_COST:
-                        allocated[tx.uid] = tx.requester
+                        self._allocated[tx.uid] = tx.requester
+                        self._available.discard(tx.uid)
                 elif tx.tx_type == TxTypes.RELEASE:
-                    allocated.pop(tx.uid, None)
+                    self._allocated.pop(tx.uid, None)
+                    self._available.add(tx.uid)
+        self._tracked_height = len(self.chain)
 
-        return allocated
+    @_locked
+    def allocation(self) -> dict[str, str]:
+        """Map of reserved item uid -> holder pubkey (a copy; callers may mutate it)."""
+        self._sync_state()
+        return dict(self._allocated)
 
+    @_locked
     def get_available(self):
-        seen = set()
-
-        for blk in self.chain:
-            for tx in blk.transactions:
-                seen.add(tx.uid)
+        self._sync_state()
+        return set(self._available)
 
-        return seen - self.allocation().keys()
+    @_locked
+    def is_reserved(self, uid: str) -> bool:
+        """Whether uid is currently held; a copy-free alternative to `uid in allocation()`."""
+        self._sync_state()
+        return uid in self._allocated
 
     def proof_of_work(self, block: Block):
-        tgt = BIT_OP * self.difficulty
-
-        while True:
-            h = block.compute_hash()
-            if h.startswith(tgt):
-                return h
-
-            block.nonce += 1
+        block.nonce, digest = find_nonce(block.hash_prefix(), block.nonce, self.target)
+        return digest.hex()
 
+    @_locked
     def add_to_mempool(self, tx: Transaction) -> bool:
         """
         Add transaction to mempool after validation.
@@ -452,8 +918,9 @@ class Blockchain:
         # Reject externally-submitted transactions that carry a system-generated
         # signature.  These signatures (COINBASE, BUYOUT_PAYMENT, etc.) are only
         # ever written by internal mining logic; accepting them from the mempool
-        # would allow an attacker to forge system transactions.
-        if tx.signature in _SYSTEM_SIGNATURES:
+        # would allow an attacker to forge system transactions.  A signature that is not
+        # a string can never verify, so it is turned away here as well.
+        if not isinstance(tx.signature, str) or tx.signature in _SYSTEM_SIGNATURES:
             return False
 
         # Validate UID format before processing
@@ -465,28 +932,26 @@ class Blockchain:
             return False
 
         # Check for duplicate in mempool (except BUYOUT_OFFER which allows multiples)
-        for existing_tx in self.mempool:
-            if existing_tx.uid == tx.uid and existing_tx.tx_type == tx.tx_type:
-                if tx.tx_type != TxTypes.BUYOUT_OFFER:
-                    return False
+        if tx.tx_type != TxTypes.BUYOUT_OFFER and self.mempool.get(tx.uid, tx.tx_type) is not None:
+            return False
 
-        # Calculate provisional balance
+        # Calculate provisional balance (only this requester's pending txs can move it)
         requester_balance = self.get_balance(tx.requester)
-        for mem_tx in self.mempool:
-            if mem_tx.requester == tx.requester:
-                requester_balance -= mem_tx.amount if mem_tx.tx_type in [TxTypes.REQUEST, TxTypes.TRANSFER,
-                                                                         TxTypes.BUYOUT_OFFER] else 0
-                requester_balance += mem_tx.amount if mem_tx.tx_type == TxTypes.RELEASE else 0
-            if mem_tx.tx_type == TxTypes.TRANSFER and mem_tx.recipient == tx.requester:
-                requester_balance += mem_tx.amount
-
-        # Get current allocation
-        cur = self.allocation()
-        for mem_tx in self.mempool:
+        for mem_tx in self.mempool.from_requester(tx.requester):
+            requester_balance -= mem_tx.amount if mem_tx.tx_type in [TxTypes.REQUEST, TxTypes.TRANSFER,
+                                                                     TxTypes.BUYOUT_OFFER] else 0
+            requester_balance += mem_tx.amount if mem_tx.tx_type == TxTypes.RELEASE else 0
+        for mem_tx in self.mempool.to_recipient(tx.requester):
+            requester_balance += mem_tx.amount
+
+        # Get current allocation of this item (only pending txs for the same uid can change it)
+        self._sync_state()
+        cur = {tx.uid: self._allocated[tx.uid]} if tx.uid in self._allocated else {}
+        for mem_tx in self.mempool.for_uid(tx.uid):
             if mem_tx.tx_type == TxTypes.REQUEST and mem_tx.amount >= ITEM_REQUEST_COST:
-                cur.add(mem_tx.uid)  # Regular request or buyout
+                cur[mem_tx.uid] = mem_tx.requester  # Regular request or buyout
             elif mem_tx.tx_type == TxTypes.RELEASE:
-                cur.discard(mem_tx.uid)
+                cur.pop(mem_tx.uid, None)
 
         # Handle REQUEST transactions (3 types: regular, buyout, penalty)
         if tx.tx_type == TxTypes.REQUEST:
@@ -536,13 +1001,10 @@ class Blockchain:
 
     def _find_buyout_offer(self, item_id: str, offer_hash: str) -> Transaction | None:
         """Find a buyout offer in mempool by item and offer hash"""
-        for tx in self.mempool:
-            if tx.tx_type == TxTypes.BUYOUT_OFFER and tx.uid == item_id:
-                # Simple hash: just use timestamp as identifier for now
-                if str(tx.timestamp) == offer_hash:
-                    return tx
-        return None
+        # Simple hash: just use timestamp as identifier for now
+        return self.mempool.buyout_offer(item_id, offer_hash)
 
+    @_locked
     def mine_block(self, miner_pubkey: ec.EllipticCurvePublicKey, max_txs: int = None) -> Block | None:
         """
         Mine a block from mempool transactions.
@@ -562,18 +1024,11 @@ class Blockchain:
         valid_txs = []
         balances = {}
         escrow_fees_for_miner = 0.0  # Accumulated escrow fees for this block
+        now = time.time()  # one clock read shared by every system tx and the block itself
 
-        # Track who currently holds each item (for buyouts and penalties)
-        item_holders = {}  # {item_id: holder_pubkey}
-        for item_id in cur:
-            # Find who requested this item by looking at chain
-            for block in reversed(self.chain):
-                for tx in block.transactions:
-                    if tx.tx_type == TxTypes.REQUEST and tx.uid == item_id and tx.amount >= ITEM_REQUEST_COST:
-                        item_holders[item_id] = tx.requester
-                        break
-                if item_id in item_holders:
-                    break
+        # Track who currently holds each item (for buyouts and penalties); the allocation
+        # already maps each reserved item to the requester of its latest regular/buyout REQUEST
+        item_holders = dict(cur)  # {item_id: holder_pubkey}
 
         for tx in txs_to_mine:
             requester = tx.requester
@@ -588,7 +1043,7 @@ class Blockchain:
                     # REGULAR REQUEST: Item available
                     if balances[requester] >= ITEM_REQUEST_COST and tx.amount == ITEM_REQUEST_COST:
                         valid_txs.append(tx)
-                        cur.add(tx.uid)
+                        cur[tx.uid] = requester
                         balances[requester] -= ITEM_REQUEST_COST
                         item_holders[tx.uid] = requester
                 else:
@@ -606,7 +1061,8 @@ class Blockchain:
                                     uid=f"BUYOUT_{tx.uid}_{tx.timestamp}",
                                     tx_type=TxTypes.TRANSFER,
                                     amount=tx.amount,
-                                    recipient=holder
+                                    recipient=holder,
+                                    ts=now
                                 )
                                 transfer.signature = "BUYOUT_PAYMENT"
                                 valid_txs.append(transfer)
@@ -629,7 +1085,8 @@ class Blockchain:
                                         uid=f"ESCROW_TO_HOLDER_{tx.uid}_{tx.timestamp}",
                                         tx_type=TxTypes.TRANSFER,
                                         amount=holder_share,
-                                        recipient=holder
+                                        recipient=holder,
+                                        ts=now
                                     )
                                     escrow_transfer.signature = "ESCROW_DISTRIBUTION"
                                     valid_txs.append(escrow_transfer)
@@ -640,7 +1097,7 @@ class Blockchain:
 
                             # Buyer gets the item (add their request)
                             valid_txs.append(tx)
-                            cur.add(tx.uid)  # Actually already in cur, but resetting holder
+                            cur[tx.uid] = requester  # Already in cur, but resetting holder
                             item_holders[tx.uid] = requester
                     else:
                         # PENALTY: Can't afford, pay penalty
@@ -654,7 +1111,7 @@ class Blockchain:
             elif tx.tx_type == TxTypes.RELEASE:
                 if tx.uid in cur:
                     valid_txs.append(tx)
-                    cur.remove(tx.uid)
+                    del cur[tx.uid]
 
                     # Holder gets current value back
                     balances[requester] += tx.amount
@@ -687,7 +1144,8 @@ class Blockchain:
             miner_pubkey,
             uid=f"COINBASE_BLOCK_{len(self.chain)}",
             tx_type=TxTypes.COINBASE,
-            amount=total_mining_reward
+            amount=total_mining_reward,
+            ts=now
         )
         coinbase.signature = "COINBASE"
 
@@ -695,7 +1153,7 @@ class Blockchain:
         all_txs = [coinbase] + valid_txs
 
         # Mine block
-        blk = Block(len(self.chain), self.last_hash, all_txs)
+        blk = Block(len(self.chain), self.last_hash, all_txs, ts=now)
         blk.hash = self.proof_of_work(blk)
         self.chain.append(blk)
 
@@ -737,9 +1195,11 @@ class Blockchain:
 
         # Remove mined transactions from mempool
         for tx in txs_to_mine:
-            if tx in self.mempool:
-                self.mempool.remove(tx)
+            self.mempool.discard(tx)
 
+        # fold the block into the ledger now, on the mutating thread, so the tip state is settled
+        self._sync_state()
+        self.mutated.set()
         return blk
         """
         Mine a block from mempool transactions.
@@ -871,112 +1331,258 @@ class Blockchain:
                     # Remove accepted offer and all others for this item from mempool
                     offers_to_remove = self.active_buyout_offers[tx.uid]
                     for offer in offers_to_remove:
-                        if offer in self.mempool:
-                            self.mempool.remove(offer)
+                        self.mempool.discard(offer)
                     del self.active_buyout_offers[tx.uid]
 
         # Remove mined transactions from mempool (not coinbase or system-generated)
         for tx in txs_to_mine:
-            if tx in self.mempool:
-                self.mempool.remove(tx)
+            self.mempool.discard(tx)
 
         return blk
 
     def remove_from_mempool(self, tx: Transaction):
         """Remove transaction from mempool"""
-        if tx in self.mempool:
-            self.mempool.remove(tx)
+        self.mempool.discard(tx)
 
     def clear_mempool_transactions(self, txs: list[Transaction]):
         """Remove multiple transactions from mempool (e.g., after receiving a block)"""
         for tx in txs:
             # Match by uid and type
-            self.mempool = [
-                mem_tx for mem_tx in self.mempool
-                if not (mem_tx.uid == tx.uid and mem_tx.tx_type == tx.tx_type)
-            ]
+            for mem_tx in self.mempool.for_uid(tx.uid):
+                if mem_tx.tx_type == tx.tx_type:
+                    self.mempool.remove(mem_tx)
 
     def add_block(self, txs: list[Transaction]):
-        # verify transaction signatures first (skip coinbase and system-generated)
-        for tx in txs:
-            if tx.tx_type not in [TxTypes.COINBASE] and tx.signature not in ["COINBASE", "BUYOUT_PAYMENT",
-                                                                             "ESCROW_DISTRIBUTION"] and not tx.verify():
-                raise ValueError(f"invalid signature for transaction {tx.uid}.")
+        # verify transaction signatures first (coinbase and system-generated are checked by type)
+        if not verify_transactions(txs):
+            bad = next(tx for tx in txs if not tx.verify())
+            raise ValueError(f"invalid signature for transaction {bad.uid}.")
+
+        with self.lock:
+            # Track balances for validation
+            balances = {}
+
+            # validate against a working copy of the tip allocation; committed only if the block is appended
+            self._sync_state()
+            cur = self._allocated.copy()
+            seen = {tx.uid for tx in txs}
+            for tx in txs:
+                # Skip coinbase validation (it creates new credits)
+                if tx.tx_type == TxTypes.COINBASE:
+                    continue
+
+                requester = tx.requester
+
+                # Get current balance
+                if requester not in balances:
+                    balances[requester] = self.get_balance(requester)
+
+                # Validate REQUEST (regular/penalty/buyout - all use tx.amount)
+                if tx.tx_type == TxTypes.REQUEST:
+                    if balances[requester] < tx.amount:
+                        raise ValueError(
+                            f"insufficient credits for {tx.uid}. Need {tx.amount:.2f}, have {balances[requester]:.2f}.")
 
-        # Track balances for validation
-        balances = {}
+                    # Regular request or buyout (amount >= ITEM_REQUEST_COST) adds to cur
+                    if tx.amount >= ITEM_REQUEST_COST:
+                        # Item must not be in cur for regular request, but can be for buyout
+                        # We trust the mining logic handled this correctly
+                        if tx.uid in cur and tx.amount == ITEM_REQUEST_COST:
+                            # This is a regular request but item already reserved - error
+                            raise ValueError(f"item {tx.uid} is already reserved (cannot regular request).")
+                        cur[tx.uid] = requester
+                    # Penalty requests (amount < ITEM_REQUEST_COST) don't change cur
 
-        # validate
-        cur = self.allocation()
-        for tx in txs:
-            # Skip coinbase validation (it creates new credits)
-            if tx.tx_type == TxTypes.COINBASE:
-                continue
+                    balances[requester] -= tx.amount
 
-            requester = tx.requester
+                elif tx.tx_type == TxTypes.RELEASE:
+                    if tx.uid not in cur:
+                        raise ValueError(f"item {tx.uid} is ready for request.")
+                    del cur[tx.uid]
+                    # Use the amount from the transaction (includes current value + escrow share)
+                    balances[requester] += tx.amount
 
-            # Get current balance
-            if requester not in balances:
-                balances[requester] = self.get_balance(requester)
+                elif tx.tx_type == TxTypes.TRANSFER:
+                    # System-generated transfers (BUYOUT_PAYMENT, ESCROW_DISTRIBUTION) are trusted
+                    if tx.signature not in ["BUYOUT_PAYMENT", "ESCROW_DISTRIBUTION"]:
+                        if balances[requester] < tx.amount:
+                            raise ValueError(
+                                f"insufficient credits for transfer. Need {tx.amount}, have {balances[requester]:.1f}.")
+                    balances[requester] -= tx.amount
+                    # Credit recipient
+                    if tx.recipient not in balances:
+                        balances[tx.recipient] = self.get_balance(tx.recipient)
+                    balances[tx.recipient] += tx.amount
 
-            # Validate REQUEST (regular/penalty/buyout - all use tx.amount)
-            if tx.tx_type == TxTypes.REQUEST:
-                if balances[requester] < tx.amount:
-                    raise ValueError(
-                        f"insufficient credits for {tx.uid}. Need {tx.amount:.2f}, have {balances[requester]:.2f}.")
-
-                # Regular request or buyout (amount >= ITEM_REQUEST_COST) adds to cur
-                if tx.amount >= ITEM_REQUEST_COST:
-                    # Item must not be in cur for regular request, but can be for buyout
-                    # We trust the mining logic handled this correctly
-                    if tx.uid in cur and tx.amount == ITEM_REQUEST_COST:
-                        # This is a regular request but item already reserved - error
-                        raise ValueError(f"item {tx.uid} is already reserved (cannot regular request).")
-                    cur.add(tx.uid)
-                # Penalty requests (amount < ITEM_REQUEST_COST) don't change cur
+            # mine & append
+            blk = Block(len(self.chain), self.last_hash, txs)
+            blk.hash = self.proof_of_work(blk)
+            self.chain.append(blk)
+
+            # signatures were verified above; the first audit can skip this block
+            self._verified_blocks.add(self._verification_key(blk, bytes.fromhex(blk.hash)))
+
+            # the working copy already reflects this block; adopt it instead of re-folding
+            self._allocated = cur
+            self._seen |= seen
+            for tx in txs:
+                self._apply_balance(tx)
+            # only uids touched by this block can change availability
+            for uid in seen:
+                if uid in cur:
+                    self._available.discard(uid)
+                else:
+                    self._available.add(uid)
 
-                balances[requester] -= tx.amount
+            # Update tracking with just this block
+            self._apply_block_tracking(blk)
+            # last: state_record() treats the tip as settled once the height catches up
+            self._tracked_height = len(self.chain)
+            self.mutated.set()
 
-            elif tx.tx_type == TxTypes.RELEASE:
-                if tx.uid not in cur:
-                    raise ValueError(f"item {tx.uid} is ready for request.")
-                cur.remove(tx.uid)
-                # Use the amount from the transaction (includes current value + escrow share)
-                balances[requester] += tx.amount
+    def to_records(self) -> list[list]:
+        """
+        Positional (keyless) form of the chain used by snapshots:
+        [index, prev_hash, nonce, timestamp, hash, [[type, requester, uid, timestamp,
+        signature, amount, recipient, accepted_offer], ...]] per block.
+        """
+        return [
+            [blk.index, blk.prev_hash, blk.nonce, blk.timestamp, blk.hash,
+             [[int(tx.tx_type), tx.requester, tx.uid, tx.timestamp, tx.signature, tx.amount,
+               tx.recipient, tx.accepted_offer] for tx in blk.transactions]]
+            for blk in self.chain
+        ]
 
-            elif tx.tx_type == TxTypes.TRANSFER:
-                # System-generated transfers (BUYOUT_PAYMENT, ESCROW_DISTRIBUTION) are trusted
-                if tx.signature not in ["BUYOUT_PAYMENT", "ESCROW_DISTRIBUTION"]:
-                    if balances[requester] < tx.amount:
-                        raise ValueError(
-                            f"insufficient credits for transfer. Need {tx.amount}, have {balances[requester]:.1f}.")
-                balances[requester] -= tx.amount
-                # Credit recipient
-                if tx.recipient not in balances:
-                    balances[tx.recipient] = self.get_balance(tx.recipient)
-                balances[tx.recipient] += tx.amount
-
-        # mine & append
-        blk = Block(len(self.chain), self.last_hash, txs)
-        blk.hash = self.proof_of_work(blk)
-        self.chain.append(blk)
+    @staticmethod
+    def from_records(records: list[list]) -> list[Block]:
+        """Rebuild blocks from to_records() output; ValueError on a row with the wrong shape or types."""
+        blocks = []
+        for idx, prev_hash, nonce, ts, blk_hash, tx_rows in records:
+            if not (_is_int(idx) and _is_int(nonce) and _is_number(ts) and _is_opt_str(prev_hash)
+                    and _is_opt_str(blk_hash) and isinstance(tx_rows, list)):
+                raise ValueError(f"malformed block record {idx!r}")
+            txs = []
+            for tx_type, requester, uid, tx_ts, sig, amount, recipient, accepted_offer in tx_rows:
+                if not (_is_int(tx_type) and isinstance(uid, str) and _is_number(tx_ts) and _is_number(amount)
+                        and _is_opt_str(sig) and _is_opt_str(recipient) and _is_opt_str(accepted_offer)):
+                    raise ValueError(f"malformed transaction record in block {idx}")
+                try:
+                    pub = deserialize_pubkey(requester)
+                except ValueError as e:
+                    raise ValueError(f"Invalid public key in saved chain: {e}")
+                txs.append(Transaction(pub, uid, tx_type, tx_ts, sig, amount, recipient, accepted_offer))
 
-        # Update tracking (rebuild from chain to stay consistent)
-        self._rebuild_item_tracking()
+            blk = Block(idx, prev_hash, txs, nonce, ts)
+            blk.hash = blk_hash
+            blocks.append(blk)
 
-    def snapshot(self, p: Path):
-        """Persist the chain to disk as JSON (safe alternative to pickle)."""
-        data = {
-            'version': 1,
-            'difficulty': self.difficulty,
-            'chain': [b.to_full_dict() for b in self.chain],
+        return blocks
+
+    @staticmethod
+    def _state_digest(state: dict) -> str:
+        """
+        SHA-256 over a fixed binary layout of a state_record() (minus its digest): height, tip
+        and every table in sorted key order. TypeError/ValueError if a field has the wrong type.
+        """
+        h = sha256(struct.pack("<q", state['height']) + _pack_str(state['tip']))
+        for name, fmt in (('balances', '<d'), ('item_request_times', '<d'), ('item_demand_counters', '<q'),
+                          ('item_values', '<d'), ('item_escrow', '<d')):
+            table = state[name]
+            h.update(struct.pack("<I", len(table)))
+            for key in sorted(table):
+                h.update(_pack_str(key) + struct.pack(fmt, table[key]))
+        allocated = state['allocated']
+        h.update(struct.pack("<I", len(allocated)))
+        for uid in sorted(allocated):
+            h.update(_pack_str(uid) + _pack_str(allocated[uid]))
+        seen = sorted(state['seen'])
+        h.update(struct.pack("<I", len(seen)))
+        for uid in seen:
+            h.update(_pack_str(uid))
+        return h.hexdigest()
+
+    @_locked
+    def state_record(self) -> dict | None:
+        """
+        Derived state at the current tip (ledger, allocation, item tracking), saved next to
+        the chain so init can adopt it instead of replaying every block. The tables are copied
+        under the lock and bound to the tip by height, hash and a digest over the record.
+        Returns None when the state isn't settled at the tip (init then replays instead).
+        """
+        self._sync_state()
+        if self._tracked_chain is not self.chain or self._tracked_height != len(self.chain):
+            return None
+        state = {
+            'height': self._tracked_height,
+            'tip': self.last_hash,
+            'balances': dict(self._balances),
+            'allocated': dict(self._allocated),
+            'seen': sorted(self._seen),
+            'item_request_times': dict(self.item_request_times),
+            'item_demand_counters': dict(self.item_demand_counters),
+            'item_values': dict(self.item_values),
+            'item_escrow': dict(self.item_escrow),
         }
+        try:
+            state['digest'] = self._state_digest(state)
+        except (struct.error, TypeError, ValueError):
+            return None  # a table holds something the layout can't pack; init will replay
+        return state
+
+    def _adopt_state(self, state: dict | None) -> bool:
+        """
+        Take over a state_record() if it was taken at this chain's tip and its digest matches.
+        Returns False, leaving everything untouched, if it is missing, stale, altered or malformed.
+        """
+        if not isinstance(state, dict):
+            return False
+        try:
+            if state['height'] != len(self.chain) or state['tip'] != self.last_hash:
+                return False
+            intern = sys.intern
+            adopted = {
+                'height': state['height'],
+                'tip': state['tip'],
+                'balances': {intern(k): float(v) for k, v in state['balances'].items()},
+                'allocated': {intern(k): intern(v) for k, v in state['allocated'].items()},
+                'seen': {intern(uid) for uid in state['seen']},
+                'item_request_times': {k: float(v) for k, v in state['item_request_times'].items()},
+                'item_demand_counters': {k: int(v) for k, v in state['item_demand_counters'].items()},
+                'item_values': {k: float(v) for k, v in state['item_values'].items()},
+                'item_escrow': {k: float(v) for k, v in state['item_escrow'].items()},
+            }
+            if self._state_digest(adopted) != state['digest']:
+                return False
+        except (KeyError, TypeError, ValueError, AttributeError, struct.error):
+            return False
+
+        self._balances = adopted['balances']
+        self._allocated = adopted['allocated']
+        self._seen = adopted['seen']
+        self._available = self._seen - self._allocated.keys()
+        self._tracked_chain = self.chain
+        self._tracked_height = len(self.chain)
+        self.item_request_times = adopted['item_request_times']
+        self.item_demand_counters = adopted['item_demand_counters']
+        self.item_values = adopted['item_values']
+        self.item_escrow = adopted['item_escrow']
+        return True
+
+    def snapshot(self, p: Path):
+        """Persist the chain to disk as JSON records (safe alternative to pickle)."""
+        with self.lock:  # the records come from one chain state even while blocks are being added
+            data = {
+                'version': SNAPSHOT_VERSION,
+                'difficulty': self.difficulty,
+                'chain': self.to_records(),
+                'state': self.state_record(),
+            }
         p.parent.mkdir(parents=True, exist_ok=True)
         # Write to a temp file then atomically rename to avoid partial writes
         tmp = p.with_suffix('.tmp')
-        with open(tmp, 'w') as fh:
-            json.dump(data, fh)
-        tmp.replace(p)
+        with open(tmp, 'wb') as fh:
+            fh.write(fastjson.dumpb(data))
+        os.replace(tmp, p)
 
     def integrity_check(self) -> bool:
         """
@@ -989,24 +1595,60 @@ class Blockchain:
         :return: success/failure
         """
         prev_timestamp: float | None = None
+        unverified: list[tuple[bytes, Block]] = []
         for i, blk in enumerate(self.chain):
-            # 1. check block hash
-            if not blk.hash_ok():
+            # 1. check block hash (a transaction whose fields can't be packed fails it too)
+            try:
+                digest = blk.compute_digest()
+                key = self._verification_key(blk, digest)
+            except ValueError:
+                return False
+            if blk.hash != digest.hex():
                 return False
             # 2. check block linkage to previous block (skipping genesis block)
             if not self.linkage_ok(i, blk):
                 return False
-            # 3. check each transaction signature
-            if not blk.signatures_ok():
-                return False
-            # 4. non-genesis blocks must satisfy proof-of-work
+            # 3. non-genesis blocks must satisfy proof-of-work
             if i > 0 and not blk.pow_ok(self.difficulty):
                 return False
-            # 5. timestamps must be monotonically non-decreasing
+            # 4. timestamps must be monotonically non-decreasing
             if prev_timestamp is not None and blk.timestamp < prev_timestamp:
                 return False
             prev_timestamp = blk.timestamp
 
+            if key not in self._verified_blocks:
+                unverified.append((key, blk))
+
+        # 5. check every not-yet-verified transaction signature as one chain-wide batch, so
+        # verification can fan out across blocks instead of being capped by the size of each block
+        if not verify_transactions([tx for _, blk in unverified for tx in blk.transactions]):
+            return False
+        self._verified_blocks.update(key for key, _ in unverified)
+
+        return True
+
+    @staticmethod
+    def _verification_key(blk: Block, digest: bytes) -> bytes:
+        """
+        Content key for a block's signature check: its recomputed digest plus every signature.
+        Keyed on content rather than the stored hash, so editing any field forces a fresh check.
+        """
+        h = sha256(digest)
+        for tx in blk.transactions:
+            h.update(_pack_str(tx.signature))
+        return h.digest()
+
+    def _signatures_ok(self, blk: Block, digest: bytes) -> bool:
+        """Block.signatures_ok(), skipped for blocks already proven clean."""
+        try:
+            key = self._verification_key(blk, digest)
+        except ValueError:
+            return False  # a signature that isn't a string can't verify
+        if key in self._verified_blocks:
+            return True
+        if not blk.signatures_ok():
+            return False
+        self._verified_blocks.add(key)
         return True
 
     def linkage_ok(self, cur_idx: int, cur_blk: Block):
@@ -1025,11 +1667,15 @@ class Blockchain:
         """
         prev_timestamp: float | None = None
         for i, blk in enumerate(self.chain):
-            if not blk.hash_ok():
+            try:
+                digest = blk.compute_digest()
+            except ValueError:
+                return i  # a transaction whose fields can't be packed
+            if blk.hash != digest.hex():
                 return i
             if not self.linkage_ok(i, blk):
                 return i
-            if not blk.signatures_ok():
+            if not self._signatures_ok(blk, digest):
                 return i
             if i > 0 and not blk.pow_ok(self.difficulty):
                 return i
@@ -1039,6 +1685,7 @@ class Blockchain:
 
         return None
 
+    @_locked
     def repair(self) -> bool:
         """
         if corruption is found, truncate the tail back
@@ -1047,14 +1694,22 @@ class Blockchain:
         :return: True if repair was needed, otherwise False
         """
         bad_idx = self.find_bad_block()
-        if not bad_idx:  # chain is in good standing
+        if bad_idx is None:  # chain is in good standing
             return False
 
         # drop the bad block and everything after it.
+        for blk in self.chain[bad_idx:]:
+            try:
+                self._verified_blocks.discard(self._verification_key(blk, blk.compute_digest()))
+            except ValueError:
+                pass  # unpackable blocks never made it into _verified_blocks
         self.chain = self.chain[:bad_idx]
-        # re-compute the hashes just in case
-        for blk in self.chain:
-            blk.hash = blk.compute_hash()
+        # every kept block already passed find_bad_block's hash check, so no rehash is needed;
+        # a corrupt genesis leaves nothing to keep, so start over from a fresh one
+        self.genesis()
+        self._rebuild_item_tracking()
+        self._sync_state()
+        self.mutated.set()
 
         return True
 
@@ -1065,105 +1720,134 @@ class Blockchain:
         1. Longer than current chain
         2. Pass full integrity check
 
+        Blocks up to the first hash that differs from ours are taken from our own chain, so
+        only the divergent suffix is rebuilt from dicts and has its signatures checked. If that
+        combination fails (one of our kept blocks is corrupt) the whole peer chain is tried.
+
         :param new_chain: List of block dicts from peer
         :return: True if chain was replaced
         """
-        if len(new_chain) <= len(self.chain):
+        # peer data: anything but a list of block dicts is rejected before the prefix scan reads it
+        if not isinstance(new_chain, list) or not all(isinstance(blk_dict, dict) for blk_dict in new_chain):
             return False
 
-        # Reconstruct blockchain from dicts
-        temp_blockchain = Blockchain(difficulty=self.difficulty)
-        temp_blockchain.chain = []
+        # validate against a copy of our blocks, so the lock isn't held through signature checks
+        with self.lock:
+            ours = list(self.chain)
+        if len(new_chain) <= len(ours):
+            return False
 
-        try:
-            for blk_dict in new_chain:
-                # Reconstruct transactions
-                txs = []
-                for tx_dict in blk_dict.get('transactions', []):
-                    pub = deserialize_pubkey(tx_dict['requester'])
-                    tx = Transaction(
-                        pub,
-                        tx_dict['uid'],
-                        tx_dict['type'],
-                        tx_dict.get('timestamp'),
-                        tx_dict.get('signature'),
-                        tx_dict.get('amount', 0.0),
-                        tx_dict.get('recipient'),
-                        tx_dict.get('accepted_offer')
+        # Common prefix: a matching stored hash at the same height is taken to be the same block
+        fork = 0
+        while fork < len(ours) and new_chain[fork].get('hash') == ours[fork].hash:
+            fork += 1
+
+        # integrity_check re-hashes and re-verifies the kept blocks too; if one of ours was
+        # edited in place the shortcut fails, so fall back to rebuilding the peer's whole chain
+        for start in ((fork, 0) if fork else (0,)):
+            # Reconstruct blockchain from dicts
+            temp_blockchain = Blockchain(difficulty=self.difficulty)
+            temp_blockchain.chain = ours[:start]
+            # verification keys are content-keyed, so signatures we already proved need no recheck
+            temp_blockchain._verified_blocks = self._verified_blocks
+
+            try:
+                for blk_dict in new_chain[start:]:
+                    # Reconstruct transactions
+                    txs = []
+                    for tx_dict in blk_dict.get('transactions', []):
+                        pub = deserialize_pubkey(tx_dict['requester'])
+                        tx = Transaction(
+                            pub,
+                            tx_dict['uid'],
+                            tx_dict['type'],
+                            tx_dict.get('timestamp'),
+                            tx_dict.get('signature'),
+                            tx_dict.get('amount', 0.0),
+                            tx_dict.get('recipient'),
+                            tx_dict.get('accepted_offer')
+                        )
+                        txs.append(tx)
+
+                    # Reconstruct block
+                    blk = Block(
+                        blk_dict['index'],
+                        blk_dict['prev_hash'],
+                        txs,
+                        blk_dict.get('nonce', 0),
+                        blk_dict.get('timestamp')
                     )
-                    txs.append(tx)
-
-                # Reconstruct block
-                blk = Block(
-                    blk_dict['index'],
-                    blk_dict['prev_hash'],
-                    txs,
-                    blk_dict.get('nonce', 0),
-                    blk_dict.get('timestamp')
-                )
-                blk.hash = blk_dict.get('hash')
-                temp_blockchain.chain.append(blk)
-
-            # Validate the new chain using our own difficulty (don't trust peer's)
-            temp_blockchain.difficulty = self.difficulty
-            if temp_blockchain.integrity_check():
-                self.chain = temp_blockchain.chain
-                # NOTE: difficulty intentionally NOT replaced from peer to prevent
-                # a peer from sending a chain with difficulty=0 to trivialise mining.
-                return True
-
-        except Exception as e:
-            print(f"Failed to validate peer chain: {e}")
+                    blk.hash = blk_dict.get('hash')
+                    temp_blockchain.chain.append(blk)
+
+                # Validate the new chain using our own difficulty (don't trust peer's)
+                temp_blockchain.difficulty = self.difficulty
+                if temp_blockchain.integrity_check():
+                    with self.lock:
+                        # blocks may have landed while the peer chain was checked; it must still be longer
+                        if len(temp_blockchain.chain) <= len(self.chain):
+                            return False
+                        self.chain = temp_blockchain.chain
+                        self._rebuild_item_tracking()
+                        self._sync_state()
+                        self.mutated.set()
+                    # NOTE: difficulty intentionally NOT replaced from peer to prevent
+                    # a peer from sending a chain with difficulty=0 to trivialise mining.
+                    return True
+
+            except Exception as e:
+                print(f"Failed to validate peer chain: {e}")
+                break
 
         return False
 
     def __str__(self):
-        return "\n".join([json.dumps(b.to_dict(), sort_keys=True) for b in self.chain])
+        return "\n".join([fastjson.dumps(b.to_dict(), sort_keys=True) for b in self.chain])
 
     @staticmethod
     def init(p: Path, difficulty: int = 2) -> 'Blockchain':
-        """Load chain from a JSON snapshot, or create a fresh one."""
+        """Load chain from a JSON records snapshot, or create a fresh one."""
         if not p.exists():
             return Blockchain(difficulty=difficulty)
 
         try:
-            with open(p, 'r') as fh:
-                data = json.load(fh)
-        except (json.JSONDecodeError, OSError) as e:
+            with open(p, 'rb') as fh:
+                data = fastjson.loads(fh.read())
+        except (fastjson.JSONDecodeError, OSError) as e:
             raise ValueError(f"Cannot load chain from {p}: {e}")
 
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Cannot load chain from {p}: unsupported snapshot version {data.get('version')}")
+
         saved_difficulty = data.get('difficulty', difficulty)
         chain = Blockchain(difficulty=saved_difficulty)
-        chain.chain = []
+        try:
+            chain.chain = Blockchain.from_records(data.get('chain', []))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Cannot load chain from {p}: {e}")
 
-        for blk_dict in data.get('chain', []):
-            txs = []
-            for tx_dict in blk_dict.get('transactions', []):
-                try:
-                    pub = deserialize_pubkey(tx_dict['requester'])
-                except (ValueError, KeyError) as e:
-                    raise ValueError(f"Invalid public key in saved chain: {e}")
-                tx = Transaction(
-                    pub,
-                    tx_dict['uid'],
-                    tx_dict['type'],
-                    tx_dict.get('timestamp'),
-                    tx_dict.get('signature'),
-                    tx_dict.get('amount', 0.0),
-                    tx_dict.get('recipient'),
-                    tx_dict.get('accepted_offer'),
-                )
-                txs.append(tx)
-
-            blk = Block(
-                blk_dict['index'],
-                blk_dict['prev_hash'],
-                txs,
-                blk_dict.get('nonce', 0),
-                blk_dict.get('timestamp'),
-            )
-            blk.hash = blk_dict.get('hash')
-            chain.chain.append(blk)
+        # the saved tip state skips the replay; stale, altered or older records fall back to it
+        if not chain._adopt_state(data.get('state')):
+            chain._sync_state()
+            chain._rebuild_item_tracking()
+        return chain
 
-        chain._rebuild_item_tracking()
-        return chain
\ No newline at end of file
+    @staticmethod
+    def set_aside(p: Path) -> Path | None:
+        """
+        Rename a snapshot init() could not load to <name>.bak (.bak1, .bak2, ... if taken), so a
+        caller starting fresh doesn't overwrite it with its next snapshot.
+        :return: the backup path, or None if there was nothing to move or the rename failed
+        """
+        if not p.exists():
+            return None
+        bak = p.with_name(p.name + '.bak')
+        n = 0
+        while bak.exists():
+            n += 1
+            bak = p.with_name(f"{p.name}.bak{n}")
+        try:
+            os.replace(p, bak)
+        except OSError:
+            return None
+        return bak
\ No newline at end of file
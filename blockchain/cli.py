@@ -0,0 +1,191 @@
+"""
+Terminal pieces shared by main.py and peer.py: the status pipe, the integrity monitor and the
+menu handlers both offer. Entry-specific handlers stay with their entry point.
+"""
+import os
+import selectors
+import sys
+from collections import deque
+from typing import Callable, NamedTuple
+
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from blockchain.blockchain import Blockchain, Transaction, TxTypes
+from blockchain.network import P2PNetwork
+
+# deque append/popleft are atomic, so producers and the input loop share it without a lock
+status_q: deque[str] = deque()
+# one byte per message wakes a waiting prompt, so status lines print as they arrive
+_status_r, _status_w = os.pipe()
+os.set_blocking(_status_r, False)
+os.set_blocking(_status_w, False)
+
+
+def post_status(msg: str):
+    status_q.append(msg)
+    try:
+        os.write(_status_w, b'\x01')
+    except BlockingIOError:
+        pass  # pipe already full of wakeups; the next drain takes every pending message anyway
+
+
+def blockchain_monitor(chain: Blockchain, interval: float = 10.0):
+    """
+    only reports once when the chain toggles status;
+    checks after every chain mutation and at least every `interval` seconds
+    :param chain:
+    :param interval:
+    :return:
+    """
+    last_ok: bool | None = None
+
+    while True:
+        cur_ok = chain.integrity_check()
+        # if state is changed, enqueue an update
+        if last_ok is None or cur_ok != last_ok:
+            if cur_ok:
+                post_status("[monitor 😁] chain is A-OK!")
+            else:
+                post_status("[monitor ⚠️] corruption detected -- repairing...")
+
+                if chain.repair():
+                    post_status("[monitor ✅] repair completed.")
+                else:
+                    post_status("[monitor ❌] repair failed.")
+
+            last_ok = cur_ok
+
+        # re-check as soon as the chain changes; the timeout still catches in-place tampering
+        chain.mutated.wait(timeout=interval)
+        chain.mutated.clear()
+
+
+def drain_status(suffix: str = '') -> None:
+    """Print every pending status message in a single write, followed by suffix."""
+    msgs = []
+    try:
+        while True:
+            msgs.append(status_q.popleft())
+    except IndexError:
+        pass
+
+    if msgs:
+        sys.stdout.write('\n'.join(msgs) + '\n' + suffix)
+        sys.stdout.flush()
+
+
+def get_user_input(prompt: str) -> str:
+    drain_status()
+
+    # selecting on stdin needs a POSIX tty (one line per read in canonical mode); elsewhere block in input()
+    if os.name != 'posix' or not sys.stdin.isatty():
+        return input(prompt)
+
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    with selectors.DefaultSelector() as sel:
+        sel.register(sys.stdin, selectors.EVENT_READ)
+        sel.register(_status_r, selectors.EVENT_READ)
+        while True:
+            for key, _ in sel.select():
+                if key.fileobj is sys.stdin:
+                    line = sys.stdin.readline()
+                    if not line:
+                        raise EOFError
+                    return line.rstrip('\n')
+                try:
+                    while os.read(_status_r, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+                # messages go on their own line, then the prompt is shown again
+                if status_q:
+                    sys.stdout.write('\n')
+                drain_status(prompt)
+
+
+def _no_op():
+    pass
+
+
+class MenuCtx(NamedTuple):
+    chain: Blockchain
+    priv_key: ec.EllipticCurvePrivateKey
+    pub_key: ec.EllipticCurvePublicKey
+    # runs after a menu action appended a block (the peer CLI broadcasts it and schedules a snapshot)
+    on_block: Callable[[], None] = _no_op
+    p2p: P2PNetwork | None = None  # only the peer CLI has a network
+
+
+def submit_single(ctx: MenuCtx, uid: str, tx_type: TxTypes, done: str):
+    # add_block would reject releasing an unheld item; refuse before paying for the signature.
+    # (a REQUEST can't be screened this way: with no amount attached it is recorded even when taken)
+    if tx_type == TxTypes.RELEASE and not ctx.chain.is_reserved(uid):
+        print(f"❌ item {uid} is ready for request.")
+        return
+
+    tx = Transaction(ctx.pub_key, uid, tx_type=tx_type)
+    tx.sign(ctx.priv_key)
+
+    try:
+        ctx.chain.add_block([tx])
+        print(f"✅ {done} {uid}")
+        ctx.on_block()
+    except ValueError as e:
+        print(f"❌ {e}")
+
+
+def handle_request(ctx: MenuCtx):
+    uid = input("item ID to request: ").strip()
+    submit_single(ctx, uid, TxTypes.REQUEST, "requested")
+
+
+def handle_release(ctx: MenuCtx):
+    uid = input(f"item ID to release: ").strip()
+    submit_single(ctx, uid, TxTypes.RELEASE, "released")
+
+
+def handle_reserved(ctx: MenuCtx):
+    allocs = ctx.chain.allocation()
+    if allocs:
+        print("allocated items: ")
+        for uid in allocs:
+            print(f" - {uid}")
+    else:
+        print("all items are available")
+
+
+def handle_available(ctx: MenuCtx):
+    a = ctx.chain.get_available()
+    if a:
+        print("available items: ")
+        for uid in a:
+            print(f" - {uid}")
+    else:
+        print("no items are available")
+
+
+def handle_multi_request(ctx: MenuCtx):
+    uids = input("enter item IDs to request: ")
+    uids = [u.strip() for u in uids.split(",") if u.strip()]
+    txs = Transaction.make_many(ctx.pub_key, uids, TxTypes.REQUEST, ctx.priv_key)
+
+    try:
+        ctx.chain.add_block(txs)
+        print(f"✅ requested {', '.join(uids)}.")
+        ctx.on_block()
+    except ValueError as e:
+        print(f"❌ {e}")
+
+
+def handle_status(ctx: MenuCtx):
+    chain = ctx.chain
+    ok = chain.integrity_check()
+    print(f"[status] blockchain is {"A-OK! 😁" if ok else "CORRUPTED! ⚠️"}")
+    print(f"[status] block count: {len(chain.chain)}")
+    print(f"[status] reserved items: {len(chain.allocation())}")
+    print(f"[status] available items: {len(chain.get_available())}")
+
+
+def invalid(ctx: MenuCtx):
+    print("invalid option.")
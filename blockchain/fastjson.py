@@ -0,0 +1,54 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses this
+
+# orjson only handles 64-bit integers: it refuses to encode larger ones and decodes them as floats.
+# _long_int() flags documents that may hold one, so they take the stdlib path instead
+_NUMBER_MASK = bytes(0x30 if 0x30 <= c <= 0x39 else 0x6f if c in b'[,:' else 0x78 for c in range(256))
+_LONG_INT = b'o' + b'0' * 19  # a value opener, then 19 digits (2**63 has 19; shorter ones always fit)
+
+
+def _long_int(data: bytes) -> bool:
+    """
+    True if data may hold an integer of 19+ digits. One C-speed pass maps digits to '0', the bytes
+    a value can follow ('[', ',', ':') to 'o' and everything else to 'x', dropping whitespace and
+    signs; digit runs inside hex hash and signature strings follow a letter or quote, not an 'o'.
+    """
+    masked = data.translate(_NUMBER_MASK, b' \t\r\n-')
+    return masked.find(_LONG_INT) != -1 or masked.startswith(_LONG_INT[1:])
+
+
+def dumpb(obj, sort_keys: bool = False) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes, using orjson when it is installed.
+    Anything orjson refuses (integers beyond 64 bits) is encoded by stdlib json instead, which
+    writes such integers exactly; the remaining difference is that orjson writes NaN/Infinity as null.
+    """
+    if orjson is not None:
+        # StrEnum keys (BlockKeys etc.) are str subclasses, which orjson only takes with NON_STR_KEYS
+        opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=opt)
+        except TypeError:
+            pass  # stdlib json raises its own TypeError if the object really isn't serializable
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':')).encode()
+
+
+def dumps(obj, sort_keys: bool = False) -> str:
+    return dumpb(obj, sort_keys).decode()
+
+
+def loads(data: bytes | str):
+    """
+    Parse JSON, using orjson when it is installed. Documents holding a 19+ digit integer go to
+    stdlib json, which keeps integers beyond 64 bits exact where orjson would turn them into floats.
+    """
+    if orjson is not None:
+        if not _long_int(data.encode() if isinstance(data, str) else data):
+            return orjson.loads(data)
+    return json.loads(data)
@@ -1,11 +1,14 @@
-import json
+import queue
+import selectors
 import socket
 import threading
 import time
+from collections import deque
 from typing import Set, Callable, Dict, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import StrEnum
-from queue import Queue, Empty
+
+from blockchain import fastjson
 
 
 class MessageType(StrEnum):
@@ -13,6 +16,7 @@ class MessageType(StrEnum):
     PEER_LIST = "peer_list"
     REQUEST_CHAIN = "request_chain"
     CHAIN_RESPONSE = "chain_response"
+    CHAIN_RANGE_RESPONSE = "chain_range_response"  # one slice of a chunked CHAIN_RESPONSE
     NEW_BLOCK = "new_block"
     NEW_TRANSACTION = "new_transaction"
     PING = "ping"
@@ -25,12 +29,20 @@ class Message:
     payload: Dict[Any, Any]
     sender: str = None
 
+    def to_dict(self) -> dict:
+        # shallow on purpose: asdict() would deep-copy the payload (a whole chain for CHAIN_RESPONSE)
+        return {'type': self.type, 'payload': self.payload, 'sender': self.sender}
+
     def to_json(self) -> str:
-        return json.dumps(asdict(self))
+        return fastjson.dumps(self.to_dict())
+
+    def to_wire(self) -> bytes:
+        """Newline-framed UTF-8 JSON, ready for sendall."""
+        return fastjson.dumpb(self.to_dict()) + b'\n'
 
     @staticmethod
-    def from_json(data: str) -> 'Message':
-        d = json.loads(data)
+    def from_json(data: str | bytes) -> 'Message':
+        d = fastjson.loads(data)
         return Message(
             type=MessageType(d['type']),
             payload=d['payload'],
@@ -45,8 +57,17 @@ class Peer:
         self.address = f"{host}:{port}"
         self.socket = sock
         self.connected = sock is not None
-        self.send_queue = Queue()
+        self.send_queue: deque[Message | bytes] = deque()
         self.lock = threading.Lock()
+        self.on_send: Callable = None  # set by P2PNetwork to wake its event loop
+
+        # Event-loop I/O state
+        self.recv_buffer = bytearray()  # raw bytes of a not yet complete message
+        self.recv_scanned = 0  # bytes of recv_buffer already known to hold no newline
+        self.out: memoryview | None = None  # unsent tail of the message being written
+        self.chain_chunks: list[dict] = []  # blocks of a chunked chain response received so far
+        self.chain_chunks_length = 0  # chain length the first slice announced
+        self.chain_chunks_bytes = 0  # wire bytes of the slices in chain_chunks
 
         # Statistics
         self.connected_at = time.time()
@@ -62,11 +83,13 @@ class Peer:
     def __eq__(self, other):
         return isinstance(other, Peer) and self.address == other.address
 
-    def send(self, message: Message):
-        """Queue message for sending"""
-        self.send_queue.put(message)
+    def send(self, message: Message | bytes):
+        """Queue message for sending; bytes are taken as an already framed to_wire() encoding"""
+        self.send_queue.append(message)
         self.messages_sent += 1
         self.last_seen = time.time()
+        if self.on_send:
+            self.on_send()
 
     def record_message_received(self):
         """Record that a message was received"""
@@ -85,9 +108,21 @@ class Peer:
 
 
 MAX_PEERS = 64  # Hard cap on simultaneous connections
+CHAIN_RANGE_BLOCKS = 100  # Blocks per CHAIN_RANGE_RESPONSE message
+MAX_CHAIN_BLOCKS = 100_000  # Longest chain a chunked response may announce
+MAX_CHAIN_BYTES = 64 * 1024 * 1024  # Slices buffered per peer before it is dropped
+LISTEN_BACKLOG = 128  # Pending accepts the kernel queues during reconnect storms
 
 
 class P2PNetwork:
+    """
+    All sockets are served by one selector thread: it accepts, reads, routes messages to the
+    callbacks and writes queued output, so N peers cost one thread instead of 2N.
+    Only outbound connects get a short-lived thread, for the blocking connect() itself.
+    Block, transaction and chain-response callbacks run in arrival order on one worker
+    thread, so trips through add_block/replace_chain never stall the other sockets.
+    """
+
     def __init__(self, host: str = "0.0.0.0", port: int = 6000):
         self.host = host
         self.port = port
@@ -97,6 +132,13 @@ class P2PNetwork:
         self.server_socket = None
         self.running = False
 
+        # Event loop
+        self.selector: selectors.BaseSelector = None
+        self._wake_r: socket.socket = None
+        self._wake_w: socket.socket = None
+        self._new_peers: deque[Peer] = deque()  # connected by other threads, awaiting registration
+        self._callbacks: queue.Queue = None  # (callback, payload) for the worker; None stops it
+
         # Callbacks for handling messages
         self.on_new_block: Callable = None
         self.on_new_transaction: Callable = None
@@ -112,87 +154,199 @@ class P2PNetwork:
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(LISTEN_BACKLOG)
+        self.server_socket.setblocking(False)
 
-        # Start accepting connections
-        threading.Thread(target=self._accept_connections, daemon=True).start()
+        # Other threads queue output or hand over peers, then poke this pair to interrupt select()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        self.selector.register(self._wake_r, selectors.EVENT_READ)
+
+        self._callbacks = queue.Queue()
+        threading.Thread(target=self._event_loop, daemon=True).start()
+        threading.Thread(target=self._callback_loop, daemon=True).start()
         print(f"🌐 P2P server running on {self.host}:{self.port}")
 
+    def _wake(self):
+        """Interrupt select(); safe to call from any thread"""
+        try:
+            self._wake_w.send(b'\0')
+        except (AttributeError, OSError):
+            pass  # loop not started / stopping, or the pipe is already full of wakeups
+
+    def _event_loop(self):
+        """Single I/O thread for every socket; runs until stop()"""
+        try:
+            while self.running:
+                try:
+                    self._poll_once()
+                except Exception as e:
+                    if self.running:
+                        print(f"❌ Network loop error: {e}")
+        finally:
+            self.selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+    def _callback_loop(self):
+        """Run chain-mutating callbacks off the I/O thread, one at a time and in order"""
+        while (item := self._callbacks.get()) is not None:
+            callback, payload = item
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"❌ Callback error: {e}")
+
+    def _dispatch(self, callback: Callable, payload):
+        """Hand a payload to the callback worker; a no-op when no callback is set"""
+        if callback:
+            self._callbacks.put((callback, payload))
+
+    def _poll_once(self):
+        """Dispatch ready sockets, adopt newly connected peers, then refresh EVENT_WRITE interest"""
+        for key, mask in self.selector.select(timeout=1):
+            if key.fileobj is self.server_socket:
+                self._accept_connections()
+            elif key.fileobj is self._wake_r:
+                try:
+                    while self._wake_r.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+            else:
+                peer: Peer = key.data
+                if mask & selectors.EVENT_READ:
+                    self._handle_peer(peer)
+                if mask & selectors.EVENT_WRITE and peer.connected:
+                    self._send_handler(peer)
+
+        while self._new_peers:
+            self._register_peer(self._new_peers.popleft())
+
+        # Only peers with pending output wait on EVENT_WRITE, so idle sockets don't spin select()
+        for key in list(self.selector.get_map().values()):
+            peer = key.data
+            if peer is None:
+                continue
+            events = selectors.EVENT_READ
+            if peer.out is not None or peer.send_queue:
+                events |= selectors.EVENT_WRITE
+            if key.events != events:
+                self.selector.modify(key.fileobj, events, peer)
+
+    def _register_peer(self, peer: Peer):
+        """Hand a connected peer's socket to the event loop (loop thread only)"""
+        if not peer.connected:
+            return
+        # Messages are small, self-contained lines; send each at once rather than waiting on
+        # Nagle, and let TCP keepalive notice peers that vanished without a FIN
+        try:
+            peer.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            peer.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            peer.socket.setblocking(False)
+            self.selector.register(peer.socket, selectors.EVENT_READ, peer)
+        except OSError as e:
+            print(f"❌ Error handling peer {peer.address}: {e}")
+            self._disconnect_peer(peer)
+
     def _accept_connections(self):
-        """Accept incoming peer connections"""
+        """Accept every pending incoming peer connection"""
         while self.running:
             try:
                 client_sock, addr = self.server_socket.accept()
-
-                # Enforce connection cap to prevent resource-exhaustion DoS
-                with self.peers_lock:
-                    if len(self.peers) >= MAX_PEERS:
-                        client_sock.close()
-                        print(f"⚠️  Rejected connection from {addr}: peer limit ({MAX_PEERS}) reached")
-                        continue
-
-                print(f"✅ Incoming connection from {addr}")
-
-                # Create peer and start handlers
-                peer = Peer(addr[0], addr[1], client_sock)
-                with self.peers_lock:
-                    self.peers.add(peer)
-
-                threading.Thread(target=self._handle_peer, args=(peer,), daemon=True).start()
-                threading.Thread(target=self._send_handler, args=(peer,), daemon=True).start()
-
+            except BlockingIOError:
+                return
             except Exception as e:
                 if self.running:
                     print(f"❌ Accept error: {e}")
+                return
+
+            # Enforce connection cap to prevent resource-exhaustion DoS
+            with self.peers_lock:
+                if len(self.peers) >= MAX_PEERS:
+                    client_sock.close()
+                    print(f"⚠️  Rejected connection from {addr}: peer limit ({MAX_PEERS}) reached")
+                    continue
+
+            print(f"✅ Incoming connection from {addr}")
+
+            peer = Peer(addr[0], addr[1], client_sock)
+            peer.on_send = self._wake
+            with self.peers_lock:
+                self.peers.add(peer)
+            self._register_peer(peer)
 
     # Maximum buffered bytes per peer before the connection is dropped
     _MAX_BUFFER = 4 * 1024 * 1024  # 4 MB
+    _RECV_SIZE = 64 * 1024
 
     def _handle_peer(self, peer: Peer):
-        """Handle messages from a peer"""
-        buffer = ""
+        """Read what a readable peer has sent and route every complete message"""
+        # Raw bytes accumulate in place and only complete lines are decoded, so a large
+        # CHAIN_RESPONSE costs one copy and one scan instead of a re-split per recv
         try:
-            while self.running and peer.connected:
-                data = peer.socket.recv(4096).decode('utf-8', errors='replace')
-                if not data:
-                    break
-
-                buffer += data
-
-                # Drop peers that send oversized messages (DoS protection)
-                if len(buffer) > self._MAX_BUFFER:
-                    print(f"⚠️  Dropping peer {peer.address}: message buffer exceeded {self._MAX_BUFFER} bytes")
-                    break
-
-                # Process complete messages (newline-delimited)
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line.strip():
-                        try:
-                            msg = Message.from_json(line)
-                            self._route_message(msg, peer)
-                        except json.JSONDecodeError:
-                            pass
+            try:
+                data = peer.socket.recv(self._RECV_SIZE)
+            except BlockingIOError:
+                return
+            if not data:
+                self._disconnect_peer(peer)
+                return
+
+            buffer = peer.recv_buffer
+            buffer += data
+
+            # Drop peers that send oversized messages (DoS protection)
+            if len(buffer) > self._MAX_BUFFER:
+                print(f"⚠️  Dropping peer {peer.address}: message buffer exceeded {self._MAX_BUFFER} bytes")
+                self._disconnect_peer(peer)
+                return
+
+            # Process complete messages (newline-delimited)
+            start = 0
+            end = buffer.find(b'\n', peer.recv_scanned)
+            while end != -1:
+                line = bytes(buffer[start:end])
+                start = end + 1
+                if line.strip():
+                    try:
+                        msg = Message.from_json(line)
+                        self._route_message(msg, peer, len(line))
+                    except (fastjson.JSONDecodeError, UnicodeDecodeError):
+                        pass
+                    if not peer.connected:
+                        return  # dropped by the message it sent
+                end = buffer.find(b'\n', start)
+            if start:
+                del buffer[:start]
+            peer.recv_scanned = len(buffer)
         except Exception as e:
             print(f"❌ Error handling peer {peer.address}: {e}")
-        finally:
             self._disconnect_peer(peer)
 
     def _send_handler(self, peer: Peer):
-        """Handle outgoing messages to a peer"""
-        while self.running and peer.connected:
-            try:
-                msg = peer.send_queue.get(timeout=1)
-                data = msg.to_json() + '\n'
-                peer.socket.sendall(data.encode('utf-8'))
-            except Empty:
-                continue
-            except Exception as e:
-                print(f"❌ Send error to {peer.address}: {e}")
-                break
+        """Write queued messages to a writable peer until the socket would block"""
+        try:
+            while True:
+                if peer.out is None:
+                    if not peer.send_queue:
+                        return
+                    msg = peer.send_queue.popleft()
+                    peer.out = memoryview(msg if isinstance(msg, bytes) else msg.to_wire())
+                sent = peer.socket.send(peer.out)
+                peer.out = peer.out[sent:] if sent < len(peer.out) else None
+        except BlockingIOError:
+            return
+        except Exception as e:
+            print(f"❌ Send error to {peer.address}: {e}")
+            self._disconnect_peer(peer)
 
-    def _route_message(self, msg: Message, peer: Peer):
-        """Route message to appropriate handler"""
+    def _route_message(self, msg: Message, peer: Peer, size: int = 0):
+        """Route message to appropriate handler; size is its length on the wire"""
         peer.record_message_received()
 
         if msg.type == MessageType.PEER_ANNOUNCE:
@@ -206,25 +360,65 @@ class P2PNetwork:
             # Callback to get chain data
             if self.on_chain_request:
                 chain_data = self.on_chain_request()
-                response = Message(MessageType.CHAIN_RESPONSE, chain_data, self.address)
-                peer.send(response)
+                count = msg.payload.get('count')
+                if not count:
+                    # Peers that don't ask for ranges get the whole chain in one message
+                    response = Message(MessageType.CHAIN_RESPONSE, chain_data, self.address)
+                    peer.send(response)
+                else:
+                    # Stream slices; each is encoded only when the socket can take it, so at
+                    # most one slice of JSON exists at a time and no message nears _MAX_BUFFER
+                    blocks = chain_data.get('chain', [])
+                    count = max(1, min(int(count), CHAIN_RANGE_BLOCKS))
+                    for i in range(max(0, int(msg.payload.get('from_index', 0))), len(blocks), count):
+                        peer.send(Message(MessageType.CHAIN_RANGE_RESPONSE, {
+                            'from_index': i,
+                            'blocks': blocks[i:i + count],
+                            'length': len(blocks)
+                        }, self.address))
+
+        elif msg.type == MessageType.CHAIN_RANGE_RESPONSE:
+            # Reassemble slices in order; the callback sees one ordinary chain response
+            from_index = msg.payload.get('from_index', 0)
+            blocks = msg.payload.get('blocks', [])
+            length = msg.payload.get('length', 0)
+            if (not isinstance(from_index, int) or not isinstance(blocks, list) or not isinstance(length, int)
+                    or not 0 < length <= MAX_CHAIN_BLOCKS or len(blocks) > CHAIN_RANGE_BLOCKS):
+                print(f"⚠️  Dropping peer {peer.address}: malformed chain slice")
+                self._disconnect_peer(peer)
+                return
+            if from_index == 0:
+                peer.chain_chunks = []
+                peer.chain_chunks_length = length
+                peer.chain_chunks_bytes = 0
+            if from_index != len(peer.chain_chunks) or length != peer.chain_chunks_length:
+                peer.chain_chunks = []  # gap, replay or a different chain: drop the partial chain
+                peer.chain_chunks_bytes = 0
+                return
+            peer.chain_chunks_bytes += size
+            if len(peer.chain_chunks) + len(blocks) > length or peer.chain_chunks_bytes > MAX_CHAIN_BYTES:
+                print(f"⚠️  Dropping peer {peer.address}: chain slices exceed the announced length or {MAX_CHAIN_BYTES} bytes")
+                self._disconnect_peer(peer)
+                return
+            peer.chain_chunks.extend(blocks)
+            if len(peer.chain_chunks) == length:
+                chain, peer.chain_chunks = peer.chain_chunks, []
+                peer.chain_chunks_bytes = 0
+                self._dispatch(self.on_chain_response, {'chain': chain, 'length': length})
 
         elif msg.type == MessageType.CHAIN_RESPONSE:
             # Callback to handle chain response
-            if self.on_chain_response:
-                self.on_chain_response(msg.payload)
+            self._dispatch(self.on_chain_response, msg.payload)
 
         elif msg.type == MessageType.NEW_BLOCK:
             peer.blocks_received += 1
             # Callback to handle new block
-            if self.on_new_block:
-                self.on_new_block(msg.payload)
+            self._dispatch(self.on_new_block, msg.payload)
 
         elif msg.type == MessageType.NEW_TRANSACTION:
             peer.transactions_received += 1
             # Callback to handle new transaction
-            if self.on_new_transaction:
-                self.on_new_transaction(msg.payload)
+            self._dispatch(self.on_new_transaction, msg.payload)
 
         elif msg.type == MessageType.PING:
             response = Message(MessageType.PONG, {}, self.address)
@@ -241,6 +435,7 @@ class P2PNetwork:
             sock.connect((host, port))
 
             peer = Peer(host, port, sock)
+            peer.on_send = self._wake
             with self.peers_lock:
                 self.peers.add(peer)
 
@@ -248,9 +443,9 @@ class P2PNetwork:
             msg = Message(MessageType.PEER_ANNOUNCE, {}, self.address)
             peer.send(msg)
 
-            # Start handlers
-            threading.Thread(target=self._handle_peer, args=(peer,), daemon=True).start()
-            threading.Thread(target=self._send_handler, args=(peer,), daemon=True).start()
+            # The event loop owns the socket from here on
+            self._new_peers.append(peer)
+            self._wake()
 
             print(f"🔗 Connected to peer: {host}:{port}")
 
@@ -261,20 +456,26 @@ class P2PNetwork:
         """Remove disconnected peer"""
         with self.peers_lock:
             self.peers.discard(peer)
+        if peer.socket is not None:
+            try:
+                self.selector.unregister(peer.socket)
+            except (KeyError, ValueError):
+                pass  # never registered (still queued in _new_peers)
         peer.close()
         print(f"❌ Peer disconnected: {peer.address}")
 
     def broadcast(self, msg: Message):
         """Broadcast message to all peers"""
         msg.sender = self.address
+        data = msg.to_wire()  # encode once; every peer queue shares the same bytes
         with self.peers_lock:
             for peer in list(self.peers):
                 if peer.connected:
-                    peer.send(msg)
+                    peer.send(data)
 
     def request_chain_from_peers(self):
-        """Request full chain from all peers"""
-        msg = Message(MessageType.REQUEST_CHAIN, {}, self.address)
+        """Request full chain from all peers, streamed in CHAIN_RANGE_BLOCKS slices by peers that support it"""
+        msg = Message(MessageType.REQUEST_CHAIN, {'from_index': 0, 'count': CHAIN_RANGE_BLOCKS}, self.address)
         self.broadcast(msg)
 
     def announce_new_block(self, block_data: dict):
@@ -290,6 +491,9 @@ class P2PNetwork:
     def stop(self):
         """Stop the P2P server"""
         self.running = False
+        self._wake()
+        if self._callbacks:
+            self._callbacks.put(None)
         if self.server_socket:
             self.server_socket.close()
         with self.peers_lock:
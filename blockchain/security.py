@@ -3,14 +3,25 @@ from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import serialization
+from functools import lru_cache
 import os
 
+SESSION_CACHE_SIZE = 256  # peers whose derived AES key is kept per CryptKeeper
+
+
+@lru_cache(maxsize=4096)
+def _load_pem_public_key(pem: bytes) -> ec.EllipticCurvePublicKey:
+    # peers resend the same PEM on every exchange; parse (and point-validate) each one once
+    return serialization.load_pem_public_key(pem)
+
 
 class CryptKeeper:
     def __init__(self, private_key=None):
         # Generate a new private key if one is not provided
         self.private_key = private_key or ec.generate_private_key(ec.SECP256R1())
         self.public_key = self.private_key.public_key()
+        # peer PEM -> (AES key, AESGCM); ECDH + HKDF run once per peer instead of once per message
+        self._session = lru_cache(maxsize=SESSION_CACHE_SIZE)(self._derive_session)
 
     def get_serialized_public_key(self):
         # Returns public key in PEM format for sharing
@@ -20,21 +31,31 @@ class CryptKeeper:
         )
 
     def load_peer_public_key(self, peer_public_bytes):
-        # Load peer's public key from PEM
-        return serialization.load_pem_public_key(peer_public_bytes)
+        # Load peer's public key from PEM (memoized; key objects are immutable and thread-safe)
+        if isinstance(peer_public_bytes, str):
+            peer_public_bytes = peer_public_bytes.encode()
+        return _load_pem_public_key(bytes(peer_public_bytes))
 
     def derive_shared_key(self, peer_public_key):
+        # 32-byte AES key shared with this peer (derived once, see _derive_session)
+        return self._session(self._peer_pem(peer_public_key))[0]
+
+    @staticmethod
+    def _peer_pem(peer_public_key) -> bytes:
+        return peer_public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+
+    def _derive_session(self, peer_pub_bytes: bytes) -> tuple[bytes, AESGCM]:
         # Use ECDH to derive a shared secret, then use HKDF to get an AES key.
         # The salt is a SHA-256 digest of both public keys (sorted lexicographically)
         # so that both parties independently arrive at the same salt without a
         # separate round-trip, while still providing meaningful salt entropy.
+        peer_public_key = _load_pem_public_key(peer_pub_bytes)
         shared_secret = self.private_key.exchange(ec.ECDH(), peer_public_key)
 
         own_pub_bytes = self.get_serialized_public_key()
-        peer_pub_bytes = peer_public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
         # Sort so both sides produce the same salt regardless of who is "local"
         ordered = sorted([own_pub_bytes, peer_pub_bytes])
         from hashlib import sha256
@@ -46,20 +67,18 @@ class CryptKeeper:
             salt=salt,
             info=b'blockchain-p2p-handshake-v1',
         ).derive(shared_secret)
-        return derived_key
+        return derived_key, AESGCM(derived_key)
 
     def encrypt(self, plaintext: bytes, peer_public_key) -> (bytes, bytes):
         # Encrypt using a key derived from peer's public key
-        key = self.derive_shared_key(peer_public_key)
-        aesgcm = AESGCM(key)
+        _, aesgcm = self._session(self._peer_pem(peer_public_key))
         nonce = os.urandom(12)  # AESGCM standard nonce size
         ciphertext = aesgcm.encrypt(nonce, plaintext, None)
         return nonce, ciphertext
 
     def decrypt(self, nonce: bytes, ciphertext: bytes, peer_public_key) -> bytes:
         # Decrypt using a key derived from peer's public key
-        key = self.derive_shared_key(peer_public_key)
-        aesgcm = AESGCM(key)
+        _, aesgcm = self._session(self._peer_pem(peer_public_key))
         return aesgcm.decrypt(nonce, ciphertext, None)
 
     def export_private_key(self, password=None):
@@ -12,6 +12,7 @@ if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
 if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
     sys.stderr.reconfigure(encoding='utf-8')
 import json
+import multiprocessing
 import time
 import threading
 import queue
@@ -47,7 +48,8 @@ _pub_key = _priv_key.public_key()
 _node_pubkey_hex = serialize_pubkey(_pub_key)
 
 # ── Blockchain state ───────────────────────────────────────────────────────────
-chain: Blockchain = Blockchain.init(CHAIN_PATH, difficulty=2) or Blockchain(difficulty=2)
+# Loaded in __main__, not at import: verify pool workers re-import this module
+chain: Blockchain = None
 
 # ── P2P network ───────────────────────────────────────────────────────────────
 _p2p_port = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
@@ -367,7 +369,8 @@ def _start_background_tasks():
                         _log("system", "❌ Corruption detected, repair failed")
                 last_ok = ok
                 notify_subscribers("integrity_update", _build_broadcast_payload())
-            time.sleep(10)
+            chain.mutated.wait(timeout=10)
+            chain.mutated.clear()
 
     def status_updater():
         while True:
@@ -775,7 +778,9 @@ def _shutdown():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # frozen builds: verify pool workers run _ecdsa_verdict, not the app
     import atexit
+    chain = Blockchain.init(CHAIN_PATH, difficulty=2) or Blockchain(difficulty=2)
     atexit.register(_shutdown)
 
     _setup_network_callbacks()
@@ -1,15 +1,18 @@
 import atexit
+import multiprocessing
 import signal
 import sys
 import threading
 import time
 from enum import IntEnum
 from pathlib import Path
-from queue import Queue, Empty
+from typing import Callable
 
 from cryptography.hazmat.primitives.asymmetric import ec
 
-from blockchain.blockchain import Blockchain, Transaction, TxTypes
+from blockchain import cli
+from blockchain.blockchain import Blockchain, Transaction
+from blockchain.cli import post_status
 from blockchain.network import P2PNetwork
 
 
@@ -29,51 +32,31 @@ class MenuItems(IntEnum):
 snap_path = Path.home().joinpath('.databox', 'material', 'blx.json')
 snap_path.parent.mkdir(parents=True, exist_ok=True)
 
-status_q = Queue()
+# set after every chain mutation; snapshot_writer coalesces them into one write per interval
+snap_dirty = threading.Event()
+snap_lock = threading.Lock()  # the writer thread and the exit flush share one temp file
 
 
-def blockchain_monitor(chain: Blockchain, interval: float = 10.0):
+def snapshot_writer(chain: Blockchain, p: Path, dirty: threading.Event, interval: float = 1.0):
     """
-    only reports once when the chain toggles status
-    :param chain:
-    :param interval:
-    :return:
+    persists the chain in the background; a burst of actions within `interval`
+    costs a single snapshot instead of one per action
     """
-    last_ok: bool | None = None
-
     while True:
-        cur_ok = chain.integrity_check()
-        # if state is changed, enqueue an update
-        if last_ok is None or cur_ok != last_ok:
-            if cur_ok:
-                status_q.put("[monitor 😁] chain is A-OK!")
-            else:
-                status_q.put("[monitor ⚠️] corruption detected -- repairing...")
-
-                if chain.repair():
-                    status_q.put("[monitor ✅] repair completed.")
-                else:
-                    status_q.put("[monitor ❌] repair failed.")
-
-            last_ok = cur_ok
-
+        dirty.wait()
         time.sleep(interval)
-
-
-def get_user_input(prompt: str) -> str:
-    # drain any pending monitor messages first
-    try:
-        while True:
-            print(status_q.get_nowait())
-    except Empty:
-        pass
-
-    return input(prompt)
+        dirty.clear()  # cleared before writing, so changes made during the write re-arm it
+        try:
+            with snap_lock:
+                chain.snapshot(p)
+        except Exception as e:  # anything but a dead writer: the next change retries the save
+            post_status(f"[snapshot ❌] could not save chain: {e}")
 
 
 def cleanup(chain: Blockchain, p: Path, network: P2PNetwork):
-    # always snapshot on exit
-    chain.snapshot(p)
+    # always snapshot on exit (the authoritative flush; the background writer may lag by an interval)
+    with snap_lock:
+        chain.snapshot(p)
     network.stop()
     print("\nbye, bye!")
 
@@ -102,14 +85,14 @@ def setup_network_callbacks(network: P2PNetwork, chain: Blockchain):
             # Validate and add block if it extends our chain
             if len(chain.chain) == block_data['index']:
                 chain.add_block(txs)
-                status_q.put(f"[network 📦] received and added block #{block_data['index']}")
-                chain.snapshot(snap_path)
+                post_status(f"[network 📦] received and added block #{block_data['index']}")
+                snap_dirty.set()
         except Exception as e:
-            status_q.put(f"[network ❌] failed to process block: {e}")
+            post_status(f"[network ❌] failed to process block: {e}")
 
     def handle_new_transaction(tx_data: dict):
         """Handle incoming transaction from peer"""
-        status_q.put(f"[network 💳] received transaction: {tx_data.get('uid')}")
+        post_status(f"[network 💳] received transaction: {tx_data.get('uid')}")
 
     def handle_chain_request() -> dict:
         """Send our chain to requesting peer"""
@@ -124,20 +107,20 @@ def setup_network_callbacks(network: P2PNetwork, chain: Blockchain):
             peer_chain = response_data.get('chain', [])
             peer_length = response_data.get('length', 0)
 
-            status_q.put(f"[consensus 📡] received chain (length {peer_length}) vs ours (length {len(chain.chain)})")
+            post_status(f"[consensus 📡] received chain (length {peer_length}) vs ours (length {len(chain.chain)})")
 
             # Try to replace our chain if peer's is longer and valid
             if chain.replace_chain(peer_chain):
-                status_q.put(f"[consensus ✅] adopted longer chain ({peer_length} blocks)")
-                chain.snapshot(snap_path)
+                post_status(f"[consensus ✅] adopted longer chain ({peer_length} blocks)")
+                snap_dirty.set()
             else:
                 if peer_length > len(chain.chain):
-                    status_q.put(f"[consensus ❌] peer chain failed validation")
+                    post_status(f"[consensus ❌] peer chain failed validation")
                 else:
-                    status_q.put(f"[consensus ℹ️] kept current chain (already longest)")
+                    post_status(f"[consensus ℹ️] kept current chain (already longest)")
 
         except Exception as e:
-            status_q.put(f"[consensus ❌] error processing chain: {e}")
+            post_status(f"[consensus ❌] error processing chain: {e}")
 
     network.on_new_block = handle_new_block
     network.on_new_transaction = handle_new_transaction
@@ -145,6 +128,47 @@ def setup_network_callbacks(network: P2PNetwork, chain: Blockchain):
     network.on_chain_response = handle_chain_response
 
 
+def _handle_connect_peer(ctx: cli.MenuCtx):
+    host = input("peer host (e.g. localhost): ").strip()
+    peer_port = int(input("peer port (e.g. 6001): ").strip())
+    ctx.p2p.connect_to_peer(host, peer_port)
+    print(f"🔗 connecting to {host}:{peer_port}...")
+
+
+def _handle_list_peers(ctx: cli.MenuCtx):
+    p2p = ctx.p2p
+    if p2p.peers:
+        print(f"connected peers ({len(p2p.peers)}):")
+        for peer in p2p.peers:
+            print(f" - {peer.address}")
+    else:
+        print("no peers connected")
+
+
+def _handle_sync_chain(ctx: cli.MenuCtx):
+    print("📡 requesting chains from all peers (consensus mechanism will choose longest valid chain)...")
+    ctx.p2p.request_chain_from_peers()
+
+
+def _handle_status(ctx: cli.MenuCtx):
+    cli.handle_status(ctx)
+    print(f"[status] connected peers: {len(ctx.p2p.peers)}")
+
+
+# EXIT is handled by the loop itself
+HANDLERS: dict[MenuItems, Callable[[cli.MenuCtx], None]] = {
+    MenuItems.REQUEST: cli.handle_request,
+    MenuItems.RELEASE: cli.handle_release,
+    MenuItems.RESERVED: cli.handle_reserved,
+    MenuItems.AVAILABLE: cli.handle_available,
+    MenuItems.MULTI_REQUEST: cli.handle_multi_request,
+    MenuItems.CONNECT_PEER: _handle_connect_peer,
+    MenuItems.LIST_PEERS: _handle_list_peers,
+    MenuItems.SYNC_CHAIN: _handle_sync_chain,
+    MenuItems.STATUS: _handle_status,
+}
+
+
 def main():
     # Get port from command line or use default
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
@@ -156,7 +180,9 @@ def main():
     try:
         chain = Blockchain.init(snap_path)
     except ValueError as e:
-        print(f"Warning: could not load chain ({e}), starting fresh.")
+        bak = Blockchain.set_aside(snap_path)
+        kept = f"; the old snapshot was kept as {bak}" if bak else ""
+        print(f"Warning: could not load chain ({e}), starting fresh{kept}.")
         chain = Blockchain()
 
     # Initialize P2P network
@@ -170,7 +196,8 @@ def main():
     signal.signal(signal.SIGTERM, lambda s, f: sys.exit(0))
 
     # start background monitoring
-    threading.Thread(target=blockchain_monitor, args=(chain, 5.0), daemon=True).start()
+    threading.Thread(target=cli.blockchain_monitor, args=(chain, 5.0), daemon=True).start()
+    threading.Thread(target=snapshot_writer, args=(chain, snap_path, snap_dirty), daemon=True).start()
 
     menu = f"""
     === Blockchain Node (Port {port}) ===
@@ -186,109 +213,22 @@ def main():
     10. exit
     """
 
+    def on_block():
+        # Broadcast to network
+        p2p.announce_new_block(chain.chain[-1].to_full_dict())
+        snap_dirty.set()
+
+    ctx = cli.MenuCtx(chain, priv_key, pub_key, on_block, p2p)
     while True:
-        choice = get_user_input(menu + "\nselect > ").strip()
+        choice = cli.get_user_input(menu + "\nselect > ").strip()
         choice = int(choice.strip())
 
-        if choice == MenuItems.REQUEST:
-            uid = input("item ID to request: ").strip()
-            tx = Transaction(pub_key, uid, tx_type=TxTypes.REQUEST)
-            tx.sign(priv_key)
-
-            try:
-                chain.add_block([tx])
-                print(f"✅ requested {uid}")
-
-                # Broadcast to network
-                p2p.announce_new_block(chain.chain[-1].to_full_dict())
-                chain.snapshot(snap_path)
-            except ValueError as e:
-                print(f"❌ {e}")
-
-        elif choice == MenuItems.RELEASE:
-            uid = input(f"item ID to release: ").strip()
-            tx = Transaction(pub_key, uid, tx_type=TxTypes.RELEASE)
-            tx.sign(priv_key)
-
-            try:
-                chain.add_block([tx])
-                print(f"✅ released {uid}")
-
-                # Broadcast to network
-                p2p.announce_new_block(chain.chain[-1].to_full_dict())
-                chain.snapshot(snap_path)
-            except ValueError as e:
-                print(f"❌ {e}")
-
-        elif choice == MenuItems.RESERVED:
-            allocs = chain.allocation()
-            if allocs:
-                print("allocated items: ")
-                for uid in allocs:
-                    print(f" - {uid}")
-            else:
-                print("all items are available")
-
-        elif choice == MenuItems.AVAILABLE:
-            a = chain.get_available()
-            if a:
-                print("available items: ")
-                for uid in a:
-                    print(f" - {uid}")
-            else:
-                print("no items are available")
-
-        elif choice == MenuItems.MULTI_REQUEST:
-            uids = input("enter item IDs to request: ")
-            uids = [u.strip() for u in uids.split(",") if u.strip()]
-            txs = []
-            for uid in uids:
-                tx = Transaction(pub_key, uid, tx_type=TxTypes.REQUEST)
-                tx.sign(priv_key)
-                txs.append(tx)
-
-            try:
-                chain.add_block(txs)
-                print(f"✅ requested {', '.join(uids)}.")
-
-                # Broadcast to network
-                p2p.announce_new_block(chain.chain[-1].to_full_dict())
-                chain.snapshot(snap_path)
-            except ValueError as e:
-                print(f"❌ {e}")
-
-        elif choice == MenuItems.CONNECT_PEER:
-            host = input("peer host (e.g. localhost): ").strip()
-            peer_port = int(input("peer port (e.g. 6001): ").strip())
-            p2p.connect_to_peer(host, peer_port)
-            print(f"🔗 connecting to {host}:{peer_port}...")
-
-        elif choice == MenuItems.LIST_PEERS:
-            if p2p.peers:
-                print(f"connected peers ({len(p2p.peers)}):")
-                for peer in p2p.peers:
-                    print(f" - {peer.address}")
-            else:
-                print("no peers connected")
-
-        elif choice == MenuItems.SYNC_CHAIN:
-            print("📡 requesting chains from all peers (consensus mechanism will choose longest valid chain)...")
-            p2p.request_chain_from_peers()
-
-        elif choice == MenuItems.STATUS:
-            ok = chain.integrity_check()
-            print(f"[status] blockchain is {"A-OK! 😁" if ok else "CORRUPTED! ⚠️"}")
-            print(f"[status] block count: {len(chain.chain)}")
-            print(f"[status] reserved items: {len(chain.allocation())}")
-            print(f"[status] available items: {len(chain.get_available())}")
-            print(f"[status] connected peers: {len(p2p.peers)}")
-
-        elif choice == MenuItems.EXIT:
+        if choice == MenuItems.EXIT:
             break
 
-        else:
-            print("invalid option.")
+        HANDLERS.get(choice, cli.invalid)(ctx)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # frozen builds: verify pool workers run _ecdsa_verdict, not the app
     main()
\ No newline at end of file
@@ -1,18 +1,25 @@
 import atexit
+import difflib
+import multiprocessing
+import os
 import signal
 import sys
 import threading
 import time
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, font as tkfont
 from pathlib import Path
 from queue import Queue, Empty
 
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 
-from blockchain.blockchain import Blockchain, Transaction, TxTypes, ITEM_REQUEST_COST
+from blockchain.blockchain import (Blockchain, Transaction, TxTypes, ITEM_REQUEST_COST, serialize_pubkey,
+                                   deserialize_pubkey)
 from blockchain.network import P2PNetwork
 
+STATUS_DEBOUNCE_MS = 250  # status requests within this window share a single widget refresh
+
 
 class BlockchainPeerUI:
     def __init__(self, root, port: int = 6000):
@@ -25,23 +32,39 @@ class BlockchainPeerUI:
         self.snap_path = Path.home().joinpath('.databox', 'material', 'blx.json')
         self.snap_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self.priv_key = ec.generate_private_key(ec.SECP256R1())
+        # Message queue for thread-safe UI updates (created first: loading the chain may already log)
+        self.message_queue = Queue()
+        # Background threads write one byte per message; Tk watches the read end and drains the queue
+        # on the main thread as soon as it is readable, instead of polling on a timer
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+
+        # Signing identity persists across restarts (one key per port, so local peers stay distinct)
+        self.key_path = self.snap_path.parent / f'peer-{port}.key'
+        self.priv_key = self._load_or_create_key()
         self.pub_key = self.priv_key.public_key()
+        self.my_pubkey_hex = serialize_pubkey(self.pub_key)
 
         # Load or create chain
         self.chain = self._load_chain()
+        # set after every chain mutation; the snapshot_writer thread coalesces them into one write per interval
+        self._snap_dirty = threading.Event()
+        self._snap_lock = threading.Lock()  # the writer thread and the exit flush share one temp file
 
         # P2P Network
         self.p2p = P2PNetwork(host="0.0.0.0", port=port)
         self._setup_network_callbacks()
         self.p2p.start()
 
-        # Message queue for thread-safe UI updates
-        self.message_queue = Queue()
-
-        # Track last state for smart updates
-        self._last_chain_length = 0
-        self._last_peer_count = 0
+        # Latest integrity_check() result; written by the integrity monitor thread, read by the UI
+        self._integrity_ok = True
+        # Latest _compute_item_view() result; refreshed by the same thread after every check
+        self._item_view = self._compute_item_view()
+        # Inputs of the last full status refresh (see _update_status_displays)
+        self._last_render_state = None
+        # Pending root.after id while a debounced status refresh is scheduled
+        self._status_after = None
 
         # Auto-mining
         self.auto_mining_enabled = tk.BooleanVar(value=False)
@@ -61,19 +84,66 @@ class BlockchainPeerUI:
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.exit_application)
 
-        # Start message processor
+        # Start message processor: event driven where Tk supports file handlers (POSIX), else polled
+        try:
+            self.root.tk.createfilehandler(self._wake_r, tk.READABLE, self._on_wake)
+            self._poll_ms = None
+        except (AttributeError, tk.TclError):
+            self._poll_ms = 100
         self._process_messages()
 
+    def _load_or_create_key(self) -> ec.EllipticCurvePrivateKey:
+        """Load the peer's DER private key, generating and saving one on first run"""
+        try:
+            key = serialization.load_der_private_key(self.key_path.read_bytes(), password=None)
+        except FileNotFoundError:
+            key = None
+        except (OSError, ValueError) as e:
+            # leave an unreadable file alone for the user to inspect; sign with a session key meanwhile
+            self.log_message(f"⚠️ Could not load {self.key_path} ({e}), using a temporary key")
+            return ec.generate_private_key(ec.SECP256R1())
+
+        if isinstance(key, ec.EllipticCurvePrivateKey):
+            return key
+        if key is not None:
+            self.log_message(f"⚠️ {self.key_path} does not hold an EC key, using a temporary key")
+            return ec.generate_private_key(ec.SECP256R1())
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        der = key.private_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        try:
+            # owner-only, and O_EXCL so two peers starting at once never interleave writes
+            fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(der)
+        except OSError as e:
+            self.log_message(f"⚠️ Could not save signing key to {self.key_path}: {e}")
+        return key
+
     def _load_chain(self):
         """Load blockchain from JSON snapshot or create new"""
         try:
             return Blockchain.init(self.snap_path)
         except ValueError as e:
-            self.log_message(f"Failed to load chain: {e}, starting fresh.")
+            bak = Blockchain.set_aside(self.snap_path)
+            kept = f"; the old snapshot was kept as {bak}" if bak else ""
+            self.log_message(f"Failed to load chain: {e}, starting fresh{kept}.")
             return Blockchain()
 
     def _create_ui(self):
         """Create the UI layout"""
+        # Named fonts, created once and shared by every widget that uses them
+        self.fonts = {
+            'small': tkfont.Font(self.root, font=('TkDefaultFont', 8)),
+            'bold9': tkfont.Font(self.root, font=('TkDefaultFont', 9, 'bold')),
+            'bold10': tkfont.Font(self.root, font=('TkDefaultFont', 10, 'bold')),
+            'mono9': tkfont.Font(self.root, font=('Courier', 9)),
+        }
+
         # Create menubar
         self._create_menubar()
 
@@ -96,7 +166,7 @@ class BlockchainPeerUI:
         instructions = ttk.Label(
             left_frame,
             text="Double-click items in Overview tab to add here",
-            font=('TkDefaultFont', 8),
+            font=self.fonts['small'],
             foreground='gray',
             wraplength=180
         )
@@ -125,7 +195,7 @@ class BlockchainPeerUI:
             row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
 
         # Batch list with action indicators
-        ttk.Label(left_frame, text="Batch Queue:", font=('TkDefaultFont', 9, 'bold')).grid(
+        ttk.Label(left_frame, text="Batch Queue:", font=self.fonts['bold9']).grid(
             row=4, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
 
         list_frame = ttk.Frame(left_frame)
@@ -142,6 +212,7 @@ class BlockchainPeerUI:
 
         # Store batch items with actions
         self.batch_items = []  # List of (action, item_id) tuples
+        self._batch_uids = set()  # item ids in batch_items, for O(1) duplicate checks
 
         # Delete key to remove
         self.batch_listbox.bind('<Delete>', lambda e: self.remove_from_batch())
@@ -163,7 +234,7 @@ class BlockchainPeerUI:
         ttk.Separator(left_frame, orient=tk.HORIZONTAL).grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E),
                                                              pady=15)
 
-        mine_label = ttk.Label(left_frame, text="Mining:", font=('TkDefaultFont', 9, 'bold'))
+        mine_label = ttk.Label(left_frame, text="Mining:", font=self.fonts['bold9'])
         mine_label.grid(row=9, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
 
         self.mine_btn = ttk.Button(left_frame, text="Mine Block from Mempool", command=self.mine_block)
@@ -190,28 +261,28 @@ class BlockchainPeerUI:
         status_frame.columnconfigure(1, weight=1)
 
         ttk.Label(status_frame, text="Chain Length:").grid(row=0, column=0, sticky=tk.W)
-        self.chain_length_label = ttk.Label(status_frame, text="0", font=('TkDefaultFont', 10, 'bold'))
+        self.chain_length_label = ttk.Label(status_frame, text="0", font=self.fonts['bold10'])
         self.chain_length_label.grid(row=0, column=1, sticky=tk.W, padx=10)
 
         ttk.Label(status_frame, text="Peers:").grid(row=0, column=2, sticky=tk.W, padx=(20, 0))
-        self.peers_label = ttk.Label(status_frame, text="0", font=('TkDefaultFont', 10, 'bold'))
+        self.peers_label = ttk.Label(status_frame, text="0", font=self.fonts['bold10'])
         self.peers_label.grid(row=0, column=3, sticky=tk.W, padx=10)
 
         ttk.Label(status_frame, text="Integrity:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.integrity_label = ttk.Label(status_frame, text="OK", font=('TkDefaultFont', 10, 'bold'),
+        self.integrity_label = ttk.Label(status_frame, text="OK", font=self.fonts['bold10'],
                                          foreground='green')
         self.integrity_label.grid(row=1, column=1, sticky=tk.W, padx=10, pady=5)
 
         ttk.Label(status_frame, text="Reserved:").grid(row=1, column=2, sticky=tk.W, padx=(20, 0), pady=5)
-        self.reserved_label = ttk.Label(status_frame, text="0", font=('TkDefaultFont', 10, 'bold'))
+        self.reserved_label = ttk.Label(status_frame, text="0", font=self.fonts['bold10'])
         self.reserved_label.grid(row=1, column=3, sticky=tk.W, padx=10, pady=5)
 
         ttk.Label(status_frame, text="Mempool:").grid(row=0, column=4, sticky=tk.W, padx=(20, 0))
-        self.mempool_label = ttk.Label(status_frame, text="0", font=('TkDefaultFont', 10, 'bold'))
+        self.mempool_label = ttk.Label(status_frame, text="0", font=self.fonts['bold10'])
         self.mempool_label.grid(row=0, column=5, sticky=tk.W, padx=10)
 
         ttk.Label(status_frame, text="Balance:").grid(row=1, column=4, sticky=tk.W, padx=(20, 0), pady=5)
-        self.balance_label = ttk.Label(status_frame, text="0.0", font=('TkDefaultFont', 10, 'bold'), foreground='blue')
+        self.balance_label = ttk.Label(status_frame, text="0.0", font=self.fonts['bold10'], foreground='blue')
         self.balance_label.grid(row=1, column=5, sticky=tk.W, padx=10, pady=5)
 
         # Tabbed notebook
@@ -230,6 +301,9 @@ class BlockchainPeerUI:
         # === Tab 4: Activity Log ===
         self._create_log_tab()
 
+        # Hidden tabs aren't refreshed; bring a tab up to date as soon as it is shown
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self._update_visible_tab())
+
         # Initial log message
         self.log_message(f"🌐 Blockchain Peer started on port {self.port}")
 
@@ -259,6 +333,7 @@ class BlockchainPeerUI:
         """Create overview tab with items"""
         overview_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(overview_frame, text="Overview")
+        self._overview_tab = overview_frame
 
         overview_frame.columnconfigure(0, weight=1)
         overview_frame.columnconfigure(1, weight=1)
@@ -268,14 +343,14 @@ class BlockchainPeerUI:
         reserved_header = ttk.Label(
             overview_frame,
             text="Reserved Items (double-click to release) [demand, expected refund]",
-            font=('TkDefaultFont', 9, 'bold')
+            font=self.fonts['bold9']
         )
         reserved_header.grid(row=0, column=0, sticky=tk.W, padx=5)
 
         available_header = ttk.Label(
             overview_frame,
             text="Available Items (double-click to request)",
-            font=('TkDefaultFont', 9, 'bold')
+            font=self.fonts['bold9']
         )
         available_header.grid(row=0, column=1, sticky=tk.W, padx=5)
 
@@ -287,7 +362,7 @@ class BlockchainPeerUI:
         reserved_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         self.reserved_listbox = tk.Listbox(reserved_frame, yscrollcommand=reserved_scrollbar.set,
-                                           selectmode=tk.SINGLE, font=('Courier', 9))
+                                           selectmode=tk.SINGLE, font=self.fonts['mono9'])
         self.reserved_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         reserved_scrollbar.config(command=self.reserved_listbox.yview)
 
@@ -309,10 +384,15 @@ class BlockchainPeerUI:
         # Double-click to add to batch for request
         self.available_listbox.bind('<Double-Button-1>', lambda e: self.add_available_to_batch())
 
+        # Rows currently shown in each listbox, diffed against on every refresh
+        self._rendered_reserved = []
+        self._rendered_available = []
+
     def _create_peers_tab(self):
         """Create peers tab with connected peer details"""
         peers_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(peers_frame, text="Peers")
+        self._peers_tab = peers_frame
 
         peers_frame.columnconfigure(0, weight=1)
         peers_frame.rowconfigure(0, weight=1)
@@ -352,10 +432,15 @@ class BlockchainPeerUI:
         self.peers_tree.column('msgs', width=100)
         self.peers_tree.column('uptime', width=120)
 
+        # peer address -> row iid, and the (text, values) last written to that row
+        self._peer_iids = {}
+        self._peer_last_values = {}
+
     def _create_blockchain_tab(self):
         """Create blockchain ledger tab"""
         blockchain_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(blockchain_frame, text="Blockchain")
+        self._blockchain_tab = blockchain_frame
 
         blockchain_frame.columnconfigure(0, weight=1)
         blockchain_frame.rowconfigure(0, weight=1)
@@ -391,6 +476,9 @@ class BlockchainPeerUI:
         self.blockchain_tree.column('txs', width=100)
         self.blockchain_tree.column('nonce', width=100)
 
+        # Block objects currently shown, oldest first; row iids are f"blk-{position}"
+        self._rendered_blocks = []
+
     def _create_log_tab(self):
         """Create activity log tab"""
         log_frame = ttk.Frame(self.notebook, padding="10")
@@ -402,147 +490,210 @@ class BlockchainPeerUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD)
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
+    def _post(self, msg_type: str, data=None):
+        """Queue a UI message and wake the Tk loop (thread-safe)"""
+        self.message_queue.put((msg_type, data))
+        try:
+            os.write(self._wake_w, b'\x01')
+        except BlockingIOError:
+            pass  # a wakeup is already pending; that drain will take this message too
+
     def log_message(self, message: str):
         """Add message to log (thread-safe)"""
-        self.message_queue.put(('log', message))
+        self._post('log', message)
 
     def update_status(self):
         """Update status displays (thread-safe)"""
-        self.message_queue.put(('status', None))
+        self._post('status')
+
+    def _on_wake(self, fd, mask):
+        """Tk file handler: runs on the main thread whenever the wake pipe is readable"""
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self._process_messages()
+
+    def _flush_log(self, lines: list[str]):
+        """Append buffered log lines with a single Text insert/see"""
+        if lines:
+            self.log_text.insert(tk.END, "".join(lines))
+            self.log_text.see(tk.END)
+            lines.clear()
 
     def _process_messages(self):
         """Process queued messages for UI updates"""
+        # one drain = one Text insert and at most one scheduled status refresh, however many messages queued
+        lines = []
+        status_pending = False
+        timestamp = time.strftime("%H:%M:%S")
         try:
             while True:
                 msg_type, data = self.message_queue.get_nowait()
 
                 if msg_type == 'log':
-                    timestamp = time.strftime("%H:%M:%S")
-                    self.log_text.insert(tk.END, f"[{timestamp}] {data}\n")
-                    self.log_text.see(tk.END)
+                    lines.append(f"[{timestamp}] {data}\n")
 
                 elif msg_type == 'status':
-                    self._update_status_displays()
+                    status_pending = True
 
                 elif msg_type == 'mine':
-                    # Auto-mining triggered from background thread
+                    # Auto-mining triggered from background thread; earlier lines go out first
+                    self._flush_log(lines)
                     self.mine_block()
 
         except Empty:
             pass
 
-        # Schedule next check
-        self.root.after(100, self._process_messages)
+        self._flush_log(lines)
+        if status_pending and self._status_after is None:
+            self._status_after = self.root.after(STATUS_DEBOUNCE_MS, self._flush_status)
+
+        # Schedule next check (only when no file handler is delivering wakeups)
+        if self._poll_ms is not None:
+            self.root.after(self._poll_ms, self._process_messages)
+
+    def _flush_status(self):
+        """Debounced status refresh: every request within STATUS_DEBOUNCE_MS shares this one"""
+        self._status_after = None
+        self._update_status_displays()
+
+    def _compute_item_view(self) -> tuple[list[str], list[str], list[str], float]:
+        """
+        Derive what the Overview lists and balance label show:
+        (sorted reserved ids, their display rows, sorted available ids, own balance).
+        Called on the integrity monitor thread, so status refreshes on the Tk thread only
+        issue widget calls; the tables are read under the chain lock for a consistent view.
+        """
+        with self.chain.lock:  # the monitor thread reads these while request handlers add blocks
+            reserved_list = sorted(self.chain.allocation())
+            # Reserved rows with value, demand, and escrow info
+            reserved_rows = []
+            for item in reserved_list:
+                demand_count = self.chain.item_demand_counters.get(item, 0)
+                current_value = self.chain.item_values.get(item, ITEM_REQUEST_COST)
+                escrow_amount = self.chain.item_escrow.get(item, 0.0)
+
+                # Format: "item_name  [Value: 11.5, Demand: 3, Escrow: 1.0]"
+                if demand_count == 0:
+                    display = f"{item:<15} [Value: {current_value:.1f}]"
+                elif demand_count >= 5:
+                    display = f"{item:<15} [Value: {current_value:.1f} 🔥{demand_count}, Escrow: {escrow_amount:.2f}]"
+                else:
+                    display = f"{item:<15} [Value: {current_value:.1f}, Demand: {demand_count}, Escrow: {escrow_amount:.2f}]"
+                reserved_rows.append(display)
+
+            available_list = sorted(self.chain.get_available())
+            balance = self.chain.get_balance(self.my_pubkey_hex)
+        return reserved_list, reserved_rows, available_list, balance
 
     def _update_status_displays(self):
         """Update all status displays"""
+        # Everything the labels, lists and trees render derives from these; skip the refresh if none moved
+        chain = self.chain.chain
+        state = (len(chain), chain[-1] if chain else None, len(self.p2p.peers), len(self.chain.mempool),
+                 self._integrity_ok, self._item_view)
+        if state == self._last_render_state:
+            # only peer counters and uptimes keep changing on their own
+            if self.notebook.select() == str(self._peers_tab):
+                self._update_peers_tree()
+            return
+        self._last_render_state = state
+
         # Chain length
-        current_chain_length = len(self.chain.chain)
+        current_chain_length = len(chain)
         self.chain_length_label.config(text=str(current_chain_length))
 
         # Peers
         current_peer_count = len(self.p2p.peers)
         self.peers_label.config(text=str(current_peer_count))
 
-        # Integrity
-        ok = self.chain.integrity_check()
+        # Integrity (as last computed by the background integrity monitor)
+        ok = self._integrity_ok
         self.integrity_label.config(
             text="OK" if ok else "CORRUPT",
             foreground="green" if ok else "red"
         )
 
+        # Item lists and balance, precomputed off the Tk thread (see _compute_item_view)
+        reserved_list, _, _, balance = self._item_view
+
         # Reserved count
-        reserved = self.chain.allocation()
-        self.reserved_label.config(text=str(len(reserved)))
+        self.reserved_label.config(text=str(len(reserved_list)))
 
         # Mempool count
         self.mempool_label.config(text=str(len(self.chain.mempool)))
 
         # Balance
-        from blockchain.blockchain import serialize_pubkey
-        my_pubkey_hex = serialize_pubkey(self.pub_key)
-        balance = self.chain.get_balance(my_pubkey_hex)
         self.balance_label.config(text=f"{balance:.1f}")
 
-        # Update listboxes while preserving selections
-        # Save reserved selection (extract item name from formatted display)
-        reserved_selection = None
-        if self.reserved_listbox.curselection():
-            idx = self.reserved_listbox.curselection()[0]
-            display_text = self.reserved_listbox.get(idx)
-            # Extract item name (before the demand info)
-            reserved_selection = display_text.split('[')[0].strip() if '[' in display_text else display_text.strip()
-
-        # Update reserved list with value, demand, and escrow info
-        self.reserved_listbox.delete(0, tk.END)
-        reserved_list = sorted(reserved)
-
-        for item in reserved_list:
-            demand_count = self.chain.item_demand_counters.get(item, 0)
-            current_value = self.chain.item_values.get(item, ITEM_REQUEST_COST)
-            escrow_amount = self.chain.item_escrow.get(item, 0.0)
-
-            # Format: "item_name  [Value: 11.5, Demand: 3, Escrow: 1.0]"
-            if demand_count == 0:
-                display = f"{item:<15} [Value: {current_value:.1f}]"
-            elif demand_count >= 5:
-                display = f"{item:<15} [Value: {current_value:.1f} 🔥{demand_count}, Escrow: {escrow_amount:.2f}]"
-            else:
-                display = f"{item:<15} [Value: {current_value:.1f}, Demand: {demand_count}, Escrow: {escrow_amount:.2f}]"
-
-            self.reserved_listbox.insert(tk.END, display)
-
-        # Restore reserved selection
-        if reserved_selection and reserved_selection in reserved_list:
-            idx = reserved_list.index(reserved_selection)
-            self.reserved_listbox.selection_set(idx)
-
-        # Save available selection
-        available_selection = None
-        if self.available_listbox.curselection():
-            idx = self.available_listbox.curselection()[0]
-            available_selection = self.available_listbox.get(idx)
-
-        # Update available list
-        available = self.chain.get_available()
-        self.available_listbox.delete(0, tk.END)
-        available_list = sorted(available)
-        for item in available_list:
-            self.available_listbox.insert(tk.END, item)
-
-        # Restore available selection
-        if available_selection and available_selection in available_list:
-            idx = available_list.index(available_selection)
-            self.available_listbox.selection_set(idx)
-
-        # Only update peers tree if peer count changed
-        if current_peer_count != self._last_peer_count:
-            self._update_peers_tree()
-            self._last_peer_count = current_peer_count
+        # Only the visible tab's widgets are synced; the others catch up when selected
+        self._update_visible_tab()
 
-        # Only update blockchain tree if chain length changed
-        if current_chain_length != self._last_chain_length:
+    def _update_visible_tab(self):
+        """Sync the widgets of the currently selected notebook tab with the chain"""
+        current = self.notebook.select()
+        if current == str(self._overview_tab):
+            self._update_item_lists()
+        elif current == str(self._peers_tab):
+            # Peers tree: only rows whose values changed are rewritten (also keeps uptime/counters current)
+            self._update_peers_tree()
+        elif current == str(self._blockchain_tab):
+            # Blockchain tree: a no-op identity scan unless blocks were added or replaced
             self._update_blockchain_tree()
-            self._last_chain_length = current_chain_length
+
+    def _update_item_lists(self):
+        """Sync the Overview listboxes with the latest precomputed item view"""
+        reserved_list, reserved_rows, available_list, _ = self._item_view
+
+        # Update listboxes, touching only rows whose text changed (unchanged rows keep their selection)
+        if reserved_rows != self._rendered_reserved:
+            # Save reserved selection (extract item name from formatted display)
+            reserved_selection = None
+            if self.reserved_listbox.curselection():
+                idx = self.reserved_listbox.curselection()[0]
+                display_text = self.reserved_listbox.get(idx)
+                # Extract item name (before the demand info)
+                reserved_selection = display_text.split('[')[0].strip() if '[' in display_text else display_text.strip()
+
+            self._sync_listbox(self.reserved_listbox, self._rendered_reserved, reserved_rows)
+
+            # Restore reserved selection if its row was rewritten
+            if reserved_selection and reserved_selection in reserved_list \
+                    and not self.reserved_listbox.curselection():
+                self.reserved_listbox.selection_set(reserved_list.index(reserved_selection))
+
+        # Update available list (rows are the item ids themselves, so kept rows keep their selection)
+        if available_list != self._rendered_available:
+            self._sync_listbox(self.available_listbox, self._rendered_available, available_list)
+
+    @staticmethod
+    def _sync_listbox(listbox, rendered: list[str], rows: list[str]):
+        """
+        Turn a listbox currently showing `rendered` into one showing `rows` with the fewest
+        delete/insert calls. Opcodes are applied back to front so earlier indices stay valid;
+        `rendered` is updated in place.
+        """
+        ops = difflib.SequenceMatcher(None, rendered, rows, autojunk=False).get_opcodes()
+        for tag, i1, i2, j1, j2 in reversed(ops):
+            if tag == 'equal':
+                continue
+            if i2 > i1:
+                listbox.delete(i1, i2 - 1)
+            if j2 > j1:
+                listbox.insert(i1, *rows[j1:j2])
+        rendered[:] = rows
 
     def _update_peers_tree(self):
-        """Update peers treeview while preserving selections"""
-        # Save current selections
-        selected_addresses = set()
-        for item in self.peers_tree.selection():
-            values = self.peers_tree.item(item, 'values')
-            if values:
-                selected_addresses.add(values[0])  # Address is first value
-
-        # Clear existing
-        for item in self.peers_tree.get_children():
-            self.peers_tree.delete(item)
-
-        # Add peers
+        """
+        Sync the peers treeview. Rows are keyed by peer address and only rewritten when their
+        displayed values change, so selections survive and idle ticks cost no Tcl calls.
+        """
         current_time = time.time()
-        peer_items = {}
+        seen = set()
 
-        for i, peer in enumerate(self.p2p.peers, 1):
+        for i, peer in enumerate(list(self.p2p.peers), 1):
             status = "Connected" if peer.connected else "Disconnected"
 
             # Calculate uptime
@@ -559,136 +710,94 @@ class BlockchainPeerUI:
             # Message stats
             msg_stats = f"{peer.messages_received}↓ {peer.messages_sent}↑"
 
-            peer_id = self.peers_tree.insert(
-                '',
-                'end',
-                text=f"Peer {i}",
-                values=(
-                    peer.address,
-                    status,
-                    peer.blocks_received,
-                    peer.transactions_received,
-                    msg_stats,
-                    uptime
-                )
+            row = (
+                f"Peer {i}",
+                (peer.address, status, peer.blocks_received, peer.transactions_received, msg_stats, uptime)
             )
+            seen.add(peer.address)
 
-            peer_items[peer.address] = peer_id
+            iid = self._peer_iids.get(peer.address)
+            if iid is None:
+                self._peer_iids[peer.address] = self.peers_tree.insert('', 'end', text=row[0], values=row[1])
+            elif self._peer_last_values.get(peer.address) != row:
+                self.peers_tree.item(iid, text=row[0], values=row[1])
+            self._peer_last_values[peer.address] = row
 
-        # Restore selections
-        items_to_select = []
-        for address in selected_addresses:
-            if address in peer_items:
-                items_to_select.append(peer_items[address])
-
-        if items_to_select:
-            self.peers_tree.selection_set(items_to_select)
+        # Drop rows of peers that went away
+        for address in [a for a in self._peer_iids if a not in seen]:
+            self.peers_tree.delete(self._peer_iids.pop(address))
+            self._peer_last_values.pop(address, None)
 
     def _update_blockchain_tree(self):
-        """Update blockchain treeview while preserving state"""
-        from blockchain.blockchain import TxTypes, ITEM_REQUEST_COST
-
-        # Save current state
-        expanded_blocks = set()
-        selected_items = set()
-
-        for item in self.blockchain_tree.get_children():
-            # Get block index from item text
-            item_text = self.blockchain_tree.item(item, 'text')
-            if 'Block #' in item_text:
-                block_idx = item_text.split('#')[1]
-
-                # Check if expanded
-                if self.blockchain_tree.item(item, 'open'):
-                    expanded_blocks.add(block_idx)
-
-                # Check if selected
-                if item in self.blockchain_tree.selection():
-                    selected_items.add(('block', block_idx))
-
-                # Check child transactions for selection
-                for child in self.blockchain_tree.get_children(item):
-                    if child in self.blockchain_tree.selection():
-                        child_text = self.blockchain_tree.item(child, 'text')
-                        selected_items.add(('tx', block_idx, child_text))
-
-        # Clear existing
-        for item in self.blockchain_tree.get_children():
-            self.blockchain_tree.delete(item)
-
-        # Add blocks in reverse order (newest first)
-        block_items = {}
-        for block in reversed(self.chain.chain):
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(block.timestamp))
-            hash_short = block.hash[:16] + "..." if block.hash and len(block.hash) > 16 else block.hash or "N/A"
-            block_idx_str = str(block.index)
-
-            block_id = self.blockchain_tree.insert(
-                '',
-                'end',
-                text=f"Block #{block.index}",
-                values=(hash_short, timestamp, len(block.transactions), block.nonce)
-            )
-
-            block_items[block_idx_str] = block_id
-
-            # Add transactions as children
-            for tx in block.transactions:
-                if tx.tx_type == TxTypes.COINBASE:
-                    tx_text = f"⛏️ COINBASE: +{tx.amount} credits"
-                    requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
-                elif tx.tx_type == TxTypes.REQUEST:
-                    tx_text = f"REQUEST: {tx.uid} (-{ITEM_REQUEST_COST} credits)"
-                    requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
-                elif tx.tx_type == TxTypes.RELEASE:
-                    refund_amount = tx.amount if tx.amount > 0 else (ITEM_REQUEST_COST * 0.5)
-                    tx_text = f"RELEASE: {tx.uid} (+{refund_amount:.1f} credits)"
-                    if hasattr(tx, 'accepted_offer') and tx.accepted_offer:
-                        tx_text += " 🤝"  # Buyout accepted
-                    requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
-                elif tx.tx_type == TxTypes.TRANSFER:
-                    tx_text = f"TRANSFER: {tx.amount} credits"
-                    requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
-                elif tx.tx_type == TxTypes.BUYOUT_OFFER:
-                    tx_text = f"💰 BUYOUT OFFER: {tx.uid} ({tx.amount} credits)"
-                    requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
-                else:
-                    tx_text = f"UNKNOWN: {tx.uid}"
-                    requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
+        """
+        Sync the blockchain treeview with the chain, touching only what changed. Blocks are
+        append-only, so rows that still match the chain (same Block objects) are kept as they
+        are, along with their expanded/selected state; only a replaced or repaired tail is
+        removed and only new blocks are inserted.
+        """
+        chain = self.chain.chain
+        rendered = self._rendered_blocks
+
+        keep = 0
+        limit = min(len(rendered), len(chain))
+        while keep < limit and rendered[keep] is chain[keep]:
+            keep += 1
+
+        # blocks no longer on the chain (adopted fork, repaired tail)
+        if keep < len(rendered):
+            self.blockchain_tree.delete(*(f"blk-{i}" for i in range(keep, len(rendered))))
+            del rendered[keep:]
+
+        # newest first: each newer block goes on top
+        for pos in range(keep, len(chain)):
+            self._insert_block_row(pos, chain[pos])
+            rendered.append(chain[pos])
+
+    def _insert_block_row(self, pos: int, block):
+        """Insert one block (and its transactions as children) at the top of the blockchain tree"""
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(block.timestamp))
+        hash_short = block.hash[:16] + "..." if block.hash and len(block.hash) > 16 else block.hash or "N/A"
+
+        block_id = self.blockchain_tree.insert(
+            '',
+            0,
+            iid=f"blk-{pos}",
+            text=f"Block #{block.index}",
+            values=(hash_short, timestamp, len(block.transactions), block.nonce)
+        )
 
-                tx_time = time.strftime("%H:%M:%S", time.localtime(tx.timestamp))
+        # Add transactions as children
+        for tx in block.transactions:
+            if tx.tx_type == TxTypes.COINBASE:
+                tx_text = f"⛏️ COINBASE: +{tx.amount} credits"
+                requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
+            elif tx.tx_type == TxTypes.REQUEST:
+                tx_text = f"REQUEST: {tx.uid} (-{ITEM_REQUEST_COST} credits)"
+                requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
+            elif tx.tx_type == TxTypes.RELEASE:
+                refund_amount = tx.amount if tx.amount > 0 else (ITEM_REQUEST_COST * 0.5)
+                tx_text = f"RELEASE: {tx.uid} (+{refund_amount:.1f} credits)"
+                if tx.accepted_offer:
+                    tx_text += " 🤝"  # Buyout accepted
+                requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
+            elif tx.tx_type == TxTypes.TRANSFER:
+                tx_text = f"TRANSFER: {tx.amount} credits"
+                requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
+            elif tx.tx_type == TxTypes.BUYOUT_OFFER:
+                tx_text = f"💰 BUYOUT OFFER: {tx.uid} ({tx.amount} credits)"
+                requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
+            else:
+                tx_text = f"UNKNOWN: {tx.uid}"
+                requester_short = tx.requester[:16] + "..." if len(tx.requester) > 16 else tx.requester
 
-                self.blockchain_tree.insert(
-                    block_id,
-                    'end',
-                    text=tx_text,
-                    values=(requester_short, tx_time, "", "")
-                )
+            tx_time = time.strftime("%H:%M:%S", time.localtime(tx.timestamp))
 
-        # Restore expanded state
-        for block_idx in expanded_blocks:
-            if block_idx in block_items:
-                self.blockchain_tree.item(block_items[block_idx], open=True)
-
-        # Restore selections
-        items_to_select = []
-        for selection in selected_items:
-            if selection[0] == 'block':
-                block_idx = selection[1]
-                if block_idx in block_items:
-                    items_to_select.append(block_items[block_idx])
-            elif selection[0] == 'tx':
-                block_idx = selection[1]
-                tx_text = selection[2]
-                if block_idx in block_items:
-                    block_id = block_items[block_idx]
-                    for child in self.blockchain_tree.get_children(block_id):
-                        if self.blockchain_tree.item(child, 'text') == tx_text:
-                            items_to_select.append(child)
-                            break
-
-        if items_to_select:
-            self.blockchain_tree.selection_set(items_to_select)
+            self.blockchain_tree.insert(
+                block_id,
+                'end',
+                text=tx_text,
+                values=(requester_short, tx_time, "", "")
+            )
 
     def add_to_batch_manual(self):
         """Add item manually to batch with selected action"""
@@ -724,13 +833,13 @@ class BlockchainPeerUI:
     def _add_to_batch(self, action, uid):
         """Internal method to add item to batch"""
         # Check for duplicates
-        for existing_action, existing_uid in self.batch_items:
-            if existing_uid == uid:
-                self.log_message(f"⚠️ '{uid}' already in batch")
-                return
+        if uid in self._batch_uids:
+            self.log_message(f"⚠️ '{uid}' already in batch")
+            return
 
         # Add to internal list
         self.batch_items.append((action, uid))
+        self._batch_uids.add(uid)
 
         # Add to visual list with cost/refund info
         if action == "RELEASE":
@@ -742,8 +851,7 @@ class BlockchainPeerUI:
             display_text = f"{action}: {uid} (+{total_refund:.2f} credits)"
         else:  # REQUEST
             # Check if item is reserved or available
-            cur = self.chain.allocation()
-            if uid not in cur:
+            if not self.chain.is_reserved(uid):
                 # Regular request
                 display_text = f"{action}: {uid} (-{ITEM_REQUEST_COST} credits)"
             else:
@@ -781,6 +889,7 @@ class BlockchainPeerUI:
 
         # Remove from both lists
         self.batch_items.pop(idx)
+        self._batch_uids.discard(uid)
         self.batch_listbox.delete(idx)
 
         count = len(self.batch_items)
@@ -795,6 +904,7 @@ class BlockchainPeerUI:
 
         if messagebox.askyesno("Clear Batch", f"Remove all {count} item{'s' if count != 1 else ''} from batch?"):
             self.batch_items.clear()
+            self._batch_uids.clear()
             self.batch_listbox.delete(0, tk.END)
             self.log_message("Batch cleared")
             self.update_execute_button()
@@ -826,8 +936,7 @@ class BlockchainPeerUI:
         total_cost = 0.0
         for action, uid in self.batch_items:
             if action == "REQUEST":
-                cur = self.chain.allocation()
-                if uid not in cur:
+                if not self.chain.is_reserved(uid):
                     # Regular request
                     total_cost += ITEM_REQUEST_COST
                 else:
@@ -894,6 +1003,7 @@ class BlockchainPeerUI:
 
             # Clear batch on success
             self.batch_items.clear()
+            self._batch_uids.clear()
             self.batch_listbox.delete(0, tk.END)
             self.update_execute_button()
             self.update_status()
@@ -928,7 +1038,7 @@ class BlockchainPeerUI:
 
                 # Broadcast the new block
                 self.p2p.announce_new_block(block.to_full_dict())
-                self.chain.snapshot(self.snap_path)
+                self._snap_dirty.set()
                 self.update_status()
             else:
                 self.log_message("❌ No valid transactions to mine")
@@ -951,7 +1061,7 @@ class BlockchainPeerUI:
                         # Check if there are transactions to mine
                         if len(self.chain.mempool) > 0:
                             # Queue the mine operation to run on main thread
-                            self.message_queue.put(('mine', None))
+                            self._post('mine')
                             time.sleep(5)  # Wait 5 seconds after mining before checking again
                         else:
                             time.sleep(2)  # Check mempool every 2 seconds when empty
@@ -969,23 +1079,22 @@ class BlockchainPeerUI:
 
     def show_connect_dialog(self):
         """Show modal dialog for connecting to peer"""
+        width, height = 400, 200
         dialog = tk.Toplevel(self.root)
         dialog.title("Connect to Peer")
-        dialog.geometry("400x200")
         dialog.transient(self.root)
-        dialog.grab_set()
 
-        # Center the dialog
-        dialog.update_idletasks()
-        x = (dialog.winfo_screenwidth() // 2) - (dialog.winfo_width() // 2)
-        y = (dialog.winfo_screenheight() // 2) - (dialog.winfo_height() // 2)
-        dialog.geometry(f"+{x}+{y}")
+        # Center over the main window in one geometry call; the size is fixed, so no layout pass is needed
+        x = self.root.winfo_rootx() + (self.root.winfo_width() - width) // 2
+        y = self.root.winfo_rooty() + (self.root.winfo_height() - height) // 2
+        dialog.geometry(f"{width}x{height}+{max(x, 0)}+{max(y, 0)}")
+        dialog.grab_set()
 
         # Dialog content
         content_frame = ttk.Frame(dialog, padding="20")
         content_frame.pack(fill=tk.BOTH, expand=True)
 
-        ttk.Label(content_frame, text="Enter peer connection details:", font=('TkDefaultFont', 10, 'bold')).pack(
+        ttk.Label(content_frame, text="Enter peer connection details:", font=self.fonts['bold10']).pack(
             pady=(0, 20))
 
         # Host
@@ -1058,8 +1167,6 @@ class BlockchainPeerUI:
 
         def handle_new_transaction(tx_data: dict):
             try:
-                from blockchain.blockchain import deserialize_pubkey
-
                 pub = deserialize_pubkey(tx_data['requester'])
                 tx = Transaction(
                     pub,
@@ -1083,7 +1190,10 @@ class BlockchainPeerUI:
 
         def handle_new_block(block_data: dict):
             try:
-                from blockchain.blockchain import Block, deserialize_pubkey
+                # Re-gossiped blocks (every peer relays each one) are dropped before any
+                # transaction is rebuilt; only the block that extends our tip is parsed
+                if len(self.chain.chain) != block_data['index']:
+                    return
 
                 txs = []
                 for tx_dict in block_data.get('transactions', []):
@@ -1100,15 +1210,14 @@ class BlockchainPeerUI:
                     )
                     txs.append(tx)
 
-                if len(self.chain.chain) == block_data['index']:
-                    self.chain.add_block(txs)
-                    self.log_message(f"📦 Received block #{block_data['index']}")
+                self.chain.add_block(txs)
+                self.log_message(f"📦 Received block #{block_data['index']}")
 
-                    # Clear these transactions from mempool
-                    self.chain.clear_mempool_transactions(txs)
+                # Clear these transactions from mempool
+                self.chain.clear_mempool_transactions(txs)
 
-                    self.chain.snapshot(self.snap_path)
-                    self.update_status()
+                self._snap_dirty.set()
+                self.update_status()
 
             except Exception as e:
                 self.log_message(f"❌ Failed to process block: {e}")
@@ -1128,7 +1237,7 @@ class BlockchainPeerUI:
 
                 if self.chain.replace_chain(peer_chain):
                     self.log_message(f"✅ Adopted longer chain ({peer_length} blocks)")
-                    self.chain.snapshot(self.snap_path)
+                    self._snap_dirty.set()
                     self.update_status()
                 else:
                     if peer_length > len(self.chain.chain):
@@ -1147,41 +1256,71 @@ class BlockchainPeerUI:
     def _start_background_tasks(self):
         """Start background monitoring threads"""
 
-        # Integrity monitor
-        def integrity_monitor():
-            last_ok = None
-            while True:
-                ok = self.chain.integrity_check()
-                if last_ok is None or ok != last_ok:
-                    if ok:
-                        self.log_message("😁 Chain integrity: OK")
+        # Integrity check: runs whenever the chain mutates, and every 10 s to catch in-place edits
+        last_ok = None
+
+        def check_integrity():
+            nonlocal last_ok
+            ok = self.chain.integrity_check()
+            self._integrity_ok = ok
+            if last_ok is None or ok != last_ok:
+                if ok:
+                    self.log_message("😁 Chain integrity: OK")
+                else:
+                    self.log_message("⚠️ Corruption detected - repairing...")
+                    if self.chain.repair():
+                        self.log_message("✅ Repair completed")
                     else:
-                        self.log_message("⚠️ Corruption detected - repairing...")
-                        if self.chain.repair():
-                            self.log_message("✅ Repair completed")
-                        else:
-                            self.log_message("❌ Repair failed")
-                    last_ok = ok
-                    self.update_status()
-                time.sleep(10)
+                        self.log_message("❌ Repair failed")
+                last_ok = ok
+            # the chain changed (or the periodic timeout hit): re-derive the item lists for the UI
+            self._item_view = self._compute_item_view()
+            self.update_status()
 
-        # Status updater
-        def status_updater():
-            while True:
-                self.update_status()
-                time.sleep(5)
+        # Periodic work shares one thread: [next due (monotonic), period, task]
+        now = time.monotonic()
+        integrity_task = [now, 10, check_integrity]
+        tasks = [integrity_task, [now + 5, 5, self.update_status]]
 
-        # Auto sync
-        def auto_sync():
-            time.sleep(10)  # Initial delay
+        def monitor():
             while True:
-                if len(self.p2p.peers) > 0:
-                    self.p2p.request_chain_from_peers()
-                time.sleep(30)  # Sync every 30 seconds
-
-        threading.Thread(target=integrity_monitor, daemon=True).start()
-        threading.Thread(target=status_updater, daemon=True).start()
-        threading.Thread(target=auto_sync, daemon=True).start()
+                for task in tasks:
+                    if task[0] <= time.monotonic():
+                        try:
+                            task[2]()
+                        except Exception as e:
+                            self.log_message(f"❌ Background task failed: {e}")
+                        task[0] = time.monotonic() + task[1]
+                timeout = max(0.0, min(task[0] for task in tasks) - time.monotonic())
+                if self.chain.mutated.wait(timeout=timeout):
+                    self.chain.mutated.clear()
+                    integrity_task[0] = 0.0  # a new or adopted block is checked straight away
+
+        # Snapshot writer: a burst of blocks within the interval costs a single snapshot
+        def snapshot_writer(interval: float = 1.0):
+            while True:
+                self._snap_dirty.wait()
+                time.sleep(interval)
+                self._snap_dirty.clear()  # cleared before writing, so changes made during the write re-arm it
+                try:
+                    with self._snap_lock:
+                        self.chain.snapshot(self.snap_path)
+                except Exception as e:  # keep the writer alive; the next change retries the save
+                    self.log_message(f"❌ Could not save chain: {e}")
+
+        threading.Thread(target=monitor, daemon=True).start()
+        threading.Thread(target=snapshot_writer, daemon=True).start()
+
+        # Auto sync runs on the Tk loop: requesting chains only queues a message per peer
+        self.root.after(10_000, self._auto_sync_tick)  # Initial delay
+
+    def _auto_sync_tick(self):
+        """Ask peers for their chains, then reschedule; stops once cleanup has started"""
+        if hasattr(self, '_cleaning_up'):
+            return
+        if len(self.p2p.peers) > 0:
+            self.p2p.request_chain_from_peers()
+        self.root.after(30_000, self._auto_sync_tick)  # Sync every 30 seconds
 
     def cleanup(self):
         """Cleanup on exit"""
@@ -1192,7 +1331,9 @@ class BlockchainPeerUI:
         # Stop auto-mining
         self.auto_mining_active = False
 
-        self.chain.snapshot(self.snap_path)
+        # the authoritative flush; the background writer may lag by an interval
+        with self._snap_lock:
+            self.chain.snapshot(self.snap_path)
         self.p2p.stop()
         self.log_message("Shutting down...")
         print("Blockchain peer shut down cleanly.")
@@ -1207,4 +1348,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # frozen builds: verify pool workers run _ecdsa_verdict, not the app
     main()
\ No newline at end of file
@@ -3,9 +3,12 @@
 # Run: python app.py
 from flask import Flask, jsonify, request, render_template, send_from_directory, Response, stream_with_context
 from pathlib import Path
-import json
+import atexit
+import multiprocessing
+import os
 import time
 from datetime import datetime
+from functools import lru_cache
 import threading
 import queue
 
@@ -13,6 +16,7 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 
 import blockchain  # local module from blockchain.py
+from blockchain import fastjson
 
 # application paths and globals
 APP_DIR = Path(__file__).parent
@@ -20,47 +24,219 @@ CHAIN_PATH = Path.home().joinpath('.databox', 'material', 'blx.json')
 
 app = Flask(__name__, static_folder=str(APP_DIR / "static"), template_folder=str(APP_DIR / "templates"))
 
-# Load or create blockchain instance
-chain = blockchain.Blockchain.init(CHAIN_PATH, difficulty=2)
+# Loaded by init_app(); importing this module has no side effects, since verify pool
+# workers re-import the entry point
+chain: blockchain.Blockchain | None = None
 
 # In-memory transaction pool (transactions waiting to be mined)
 tx_pool: list[blockchain.Transaction] = []
 
 # Subscribers for Server-Sent Events (SSE). Each subscriber is a queue.Queue.
-_subscribers: list[queue.Queue] = []
+# Copy-on-write: (un)register swaps in a new tuple under the lock, so notify reads it without locking.
+_subscribers: tuple[queue.Queue, ...] = ()
 _subscribers_lock = threading.Lock()
 
+# Bumped by every endpoint that changes the chain, the pool or a block in place; the broadcast
+# payload is rebuilt only when it moves, so SSE connects, /api/summary and saves reuse the last one
+_state_version = 0
+_state_lock = threading.Lock()
+_payload_cache: tuple[int, dict | None] = (-1, None)
+# Bumped only when the chain itself changes; pool-only changes keep the cached chain stats
+_chain_version = 0
+_chain_stats_cache: tuple[int, dict | None] = (-1, None)
+
+# Mutating endpoints only flag a broadcast; _broadcaster folds a burst of them into one SSE update
+_broadcast_dirty = threading.Event()
+_broadcast_event = "update"  # name of the latest change, passed on to notify_subscribers
+
+# Mutating endpoints only flag the chain dirty; _snapshot_writer does the disk I/O off the request path
+_snap_dirty = threading.Event()
+_snap_lock = threading.Lock()
+
 
 def register_subscriber() -> queue.Queue:
     """Create and register a new subscriber queue, thread-safe."""
-    q = queue.Queue(maxsize=32)
+    global _subscribers
+    q = queue.Queue(maxsize=1)  # latest-wins slot: every frame carries the full state
     with _subscribers_lock:
-        _subscribers.append(q)
+        _subscribers = _subscribers + (q,)
     return q
 
 
 def unregister_subscriber(q: queue.Queue):
     """Remove subscriber queue, thread-safe."""
+    global _subscribers
     with _subscribers_lock:
-        try:
-            _subscribers.remove(q)
-        except ValueError:
-            pass
+        _subscribers = tuple(s for s in _subscribers if s is not q)
+
+
+def _sse_frame(payload: dict) -> bytes:
+    """Encode payload as a complete SSE 'update' event."""
+    return b"event: update\ndata: " + fastjson.dumpb(payload) + b"\n\n"
 
 
 def notify_subscribers(event: str, payload: dict):
     """
-    Put an update into every subscriber queue. Non-blocking: if a queue is full we drop the message for that subscriber.
-    The payload will be JSON-serialized by the SSE generator.
+    Put an update into every subscriber queue. Non-blocking: a slow subscriber's unsent frame is replaced,
+    since each frame carries the full state and only the newest one matters.
+    The payload is encoded once here; queues carry finished SSE frames (bytes) that the generator writes verbatim.
     """
-    data = {"event": event, "payload": payload}
-    with _subscribers_lock:
-        for q in list(_subscribers):
+    frame = _sse_frame(payload)
+    for q in _subscribers:
+        try:
+            q.put_nowait(frame)
+        except queue.Full:
+            # slow consumer: swap its stale pending frame for this one
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
             try:
-                q.put_nowait(data)
+                q.put_nowait(frame)
             except queue.Full:
-                # slow consumer, drop this update for that subscriber
-                continue
+                continue  # a concurrent notifier refilled the slot meanwhile
+
+
+def _schedule_broadcast(event: str):
+    """Ask the broadcaster to push the current state; changes within its window share one broadcast."""
+    global _broadcast_event
+    _broadcast_event = event
+    _broadcast_dirty.set()
+
+
+def _broadcaster(interval: float = 0.05):
+    while True:
+        _broadcast_dirty.wait()
+        time.sleep(interval)
+        _broadcast_dirty.clear()  # cleared before building, so changes made meanwhile re-arm it
+        try:
+            notify_subscribers(_broadcast_event, _broadcast_payload())
+        except Exception as e:
+            print(f"could not broadcast update: {e}")
+
+
+def _schedule_snapshot():
+    """Ask the background writer to persist the chain; a burst of calls costs a single snapshot."""
+    _snap_dirty.set()
+
+
+def _save_snapshot():
+    """Write the chain to disk now, serialized with the background writer."""
+    with _snap_lock:
+        chain.snapshot(CHAIN_PATH)
+
+
+def _snapshot_writer(interval: float = 1.0):
+    while True:
+        _snap_dirty.wait()
+        time.sleep(interval)
+        _snap_dirty.clear()  # cleared before writing, so changes made during the write re-arm it
+        try:
+            _save_snapshot()
+        except Exception as e:  # keep the writer alive; the next change retries the save
+            print(f"could not save chain: {e}")
+
+
+def _flush_snapshot():
+    """At exit, write whatever the background writer has not persisted yet."""
+    if _snap_dirty.is_set():
+        _save_snapshot()
+
+
+def init_app():
+    """Load or create the blockchain and start the background broadcaster and snapshot writer."""
+    global chain
+    chain = blockchain.Blockchain.init(CHAIN_PATH, difficulty=2)
+    threading.Thread(target=_broadcaster, daemon=True).start()
+    threading.Thread(target=_snapshot_writer, daemon=True).start()
+    atexit.register(_flush_snapshot)
+
+
+def _json_response(obj) -> Response:
+    """jsonify() for the hot read endpoints, encoded by fastjson (orjson when installed)."""
+    return Response(fastjson.dumpb(obj), mimetype="application/json")
+
+
+# Versions restart with the process; salting the ETags keeps a pre-restart tag from matching
+_ETAG_SALT = os.urandom(4).hex()
+
+
+def _versioned_json(version: str, build) -> Response:
+    """
+    _json_response(build()) tagged with a weak ETag for the given state version.
+    A client whose If-None-Match already holds that tag gets an empty 304 and nothing is built.
+    Read the version before build() runs, so a change made meanwhile is never hidden behind an old tag.
+    """
+    etag = f"{_ETAG_SALT}-{version}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = _json_response(build())
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def _state_changed(chain_changed: bool = True):
+    """
+    Invalidate the cached broadcast payload; call after the change, before notifying.
+    Pass chain_changed=False when only the tx pool moved, so the integrity walk is reused.
+    """
+    global _state_version, _chain_version
+    with _state_lock:
+        _state_version += 1
+        if chain_changed:
+            _chain_version += 1
+
+
+def _chain_stats() -> dict:
+    """
+    Allocation, availability and integrity for the current chain version (same read-before-build rule as
+    the payload). Shared between payloads, so the item lists are tuples.
+    """
+    global _chain_stats_cache
+    version = _chain_version
+    cached_version, stats = _chain_stats_cache
+    if cached_version != version:
+        # the broadcaster thread gets here while request threads add blocks: read one chain state
+        with chain.lock:
+            # find_bad_block applies every integrity_check rule, so one walk answers both
+            bad_idx = chain.find_bad_block()
+            stats = {
+                "allocated": tuple(chain.allocation()),
+                "available": tuple(chain.get_available()),
+                "integrity_ok": bad_idx is None,
+                "bad_block_index": bad_idx
+            }
+        _chain_stats_cache = (version, stats)
+    return stats
+
+
+def _broadcast_payload() -> dict:
+    """
+    The _build_broadcast_payload() result for the current state version.
+    The version is read before building, so a change made mid-build leaves the cache stale-tagged and the
+    next call rebuilds. Callers share the returned dict and must not modify it.
+    """
+    global _payload_cache
+    version = _state_version
+    cached_version, payload = _payload_cache
+    if cached_version != version:
+        payload = _build_broadcast_payload()
+        _payload_cache = (version, payload)
+    return payload
+
+
+@lru_cache(maxsize=256)
+def _load_private_key(pem: bytes) -> ec.EllipticCurvePrivateKey:
+    # clients sign tx after tx with the same PEM; parse (and validate) each one once. Bounded, since
+    # every distinct PEM posted stays resident; parse failures raise and are not cached
+    return serialization.load_pem_private_key(pem, password=None)
+
+
+@lru_cache(maxsize=4096)
+def _time_label(ts: float) -> str:
+    """ISO-8601 UTC chart label for a block timestamp; keyed by value, so an edited timestamp gets a new one."""
+    return datetime.utcfromtimestamp(ts).isoformat() + "Z"
 
 
 def _build_broadcast_payload() -> dict:
@@ -68,28 +244,22 @@ def _build_broadcast_payload() -> dict:
     Aggregate chain, summary and pool into a simple dict used by the UI for live updates.
     Uses to_full_dict() for blocks to include signatures and easier client display.
     """
-    blocks = [b.to_full_dict() for b in chain.chain]
+    with chain.lock:  # blocks and stats describe the same chain
+        blocks = [b.to_full_dict() for b in chain.chain]
+        stats = _chain_stats()
     # summary: small metrics for charts
     txs_per_block = [len(b["transactions"]) for b in blocks]
     block_indexes = [b["index"] for b in blocks]
-    block_time_labels = [datetime.utcfromtimestamp(float(b["timestamp"])).isoformat() + "Z" for b in blocks]
-    allocated = list(chain.allocation())
-    available = list(chain.get_available())
+    block_time_labels = [_time_label(float(b["timestamp"])) for b in blocks]
     summary = {
         "chain_length": len(blocks),
         "difficulty": chain.difficulty,
-        "allocated_count": len(allocated),
-        "available_count": len(available),
+        "allocated_count": len(stats["allocated"]),
+        "available_count": len(stats["available"]),
         "txs_per_block": txs_per_block,
         "block_indexes": block_indexes,
         "block_time_labels": block_time_labels
     }
-    stats = {
-        "allocated": allocated,
-        "available": available,
-        "integrity_ok": chain.integrity_check(),
-        "bad_block_index": chain.find_bad_block()
-    }
     pool = [tx.to_full_dict() for tx in tx_pool]
     return {"summary": summary, "chain": blocks, "stats": stats, "pool": pool}
 
@@ -138,7 +308,7 @@ def api_create_tx():
         return jsonify({"error": "uid contains invalid characters or is too long"}), 400
 
     try:
-        priv = serialization.load_pem_private_key(pem.encode(), password=None)
+        priv = _load_private_key(pem.encode())
     except Exception as e:
         return jsonify({"error": f"invalid private key: {e}"}), 400
 
@@ -148,7 +318,8 @@ def api_create_tx():
 
     # append to pool and notify subscribers for live updates
     tx_pool.append(tx)
-    notify_subscribers("pool_updated", _build_broadcast_payload())
+    _state_changed(chain_changed=False)
+    _schedule_broadcast("pool_updated")
 
     return jsonify({"tx": tx.to_full_dict()})
 
@@ -156,13 +327,14 @@ def api_create_tx():
 @app.route("/api/pool", methods=["GET"])
 def api_pool():
     """Return the current transaction pool (full dicts including signatures)."""
-    return jsonify({"tx_pool": [tx.to_full_dict() for tx in tx_pool]})
+    return _versioned_json(f"s{_state_version}", lambda: {"tx_pool": [tx.to_full_dict() for tx in tx_pool]})
 
 
 @app.route("/api/clear_pool", methods=["POST"])
 def api_clear_pool():
     tx_pool.clear()
-    notify_subscribers("pool_cleared", _build_broadcast_payload())
+    _state_changed(chain_changed=False)
+    _schedule_broadcast("pool_cleared")
     return jsonify({"ok": True})
 
 
@@ -202,32 +374,29 @@ def api_add_block():
 
     # Clear pool on successful mining and persist chain, then notify subscribers
     tx_pool.clear()
-    chain.snapshot(CHAIN_PATH)
-    notify_subscribers("block_added", _build_broadcast_payload())
+    _state_changed()
+    _schedule_snapshot()
+    _schedule_broadcast("block_added")
     return jsonify({"ok": True, "chain_length": len(chain.chain)})
 
 
 @app.route("/api/chain", methods=["GET"])
 def api_chain():
     """Return the entire chain: blocks include transactions with signatures."""
-    return jsonify({"chain": [b.to_full_dict() for b in chain.chain], "difficulty": chain.difficulty, "length": len(chain.chain)})
+    return _versioned_json(f"c{_chain_version}", lambda: {"chain": [b.to_full_dict() for b in chain.chain],
+                                                          "difficulty": chain.difficulty, "length": len(chain.chain)})
 
 
 @app.route("/api/summary", methods=["GET"])
 def api_summary():
     """Return summarized metrics for charts used by the UI."""
-    payload = _build_broadcast_payload()
-    return jsonify(payload["summary"])
+    return _versioned_json(f"c{_chain_version}", lambda: _broadcast_payload()["summary"])
 
 
 @app.route("/api/stats", methods=["GET"])
 def api_stats():
     """Return allocation and available sets and integrity info (used by UI)."""
-    allocated = list(chain.allocation())
-    available = list(chain.get_available())
-    integrity = chain.integrity_check()
-    bad_idx = chain.find_bad_block()
-    return jsonify({"allocated": allocated, "available": available, "integrity_ok": integrity, "bad_block_index": bad_idx})
+    return _versioned_json(f"c{_chain_version}", lambda: _broadcast_payload()["stats"])
 
 
 @app.route("/api/repair", methods=["POST"])
@@ -235,15 +404,16 @@ def api_repair():
     """Attempt to repair the chain and persist if repaired, then notify subscribers."""
     repaired = chain.repair()
     if repaired:
-        chain.snapshot(CHAIN_PATH)
-    notify_subscribers("repaired", _build_broadcast_payload())
+        _state_changed()
+        _schedule_snapshot()
+    _schedule_broadcast("repaired")
     return jsonify({"repaired": repaired})
 
 
 @app.route("/api/save", methods=["POST"])
 def api_save():
-    chain.snapshot(CHAIN_PATH)
-    notify_subscribers("saved", _build_broadcast_payload())
+    _save_snapshot()  # an explicit save is synchronous, so "saved" means on disk
+    _schedule_broadcast("saved")
     return jsonify({"saved": True})
 
 
@@ -253,7 +423,8 @@ def api_load():
     global chain
     try:
         chain = blockchain.Blockchain.init(CHAIN_PATH)
-        notify_subscribers("loaded", _build_broadcast_payload())
+        _state_changed()
+        _schedule_broadcast("loaded")
         return jsonify({"loaded": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -284,8 +455,9 @@ def api_corrupt_block():
         return jsonify({"error": "unsupported field"}), 400
 
     # intentionally avoid recomputing hash so integrity breaks
-    chain.snapshot(CHAIN_PATH)
-    notify_subscribers("corrupted", _build_broadcast_payload())
+    _state_changed()
+    _schedule_snapshot()
+    _schedule_broadcast("corrupted")
     return jsonify({"ok": True, "message": "block corrupted"})
 
 
@@ -300,17 +472,15 @@ def stream():
     def event_stream(q_local: queue.Queue):
         try:
             # Immediately send initial state so clients don't wait for changes
-            initial = _build_broadcast_payload()
-            yield f"event: update\ndata: {json.dumps(initial)}\n\n"
+            yield _sse_frame(_broadcast_payload())
             # Keep streaming updates from the queue
             while True:
                 try:
-                    item = q_local.get(timeout=15)  # wait for next update or heartbeat
-                    # SSE event named 'update'
-                    yield f"event: update\ndata: {json.dumps(item['payload'])}\n\n"
+                    # wait for next update or heartbeat; each item is an encoded SSE 'update' event
+                    yield q_local.get(timeout=15)
                 except queue.Empty:
                     # send a heartbeat comment to keep connection alive
-                    yield ": heartbeat\n\n"
+                    yield b": heartbeat\n\n"
         finally:
             # Ensure we unregister when client disconnects
             unregister_subscriber(q_local)
@@ -320,5 +490,7 @@ def stream():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # frozen builds: verify pool workers run _ecdsa_verdict, not the app
+    init_app()
     # Run the Flask dev server (sufficient for demo). For production, use a WSGI server that supports long-lived responses.
     app.run(debug=False, threaded=True, host="127.0.0.1", port=5000)
\ No newline at end of file